@@ -0,0 +1,154 @@
+# Synthetic documents shared by the benchmark scripts. Nothing here is checked
+# in as binary data; every fixture is generated on the fly (PDFs with PyMuPDF,
+# images with Pillow, web pages as plain strings).
+
+LOREM = (
+    "Copy Pasta extracts text from websites, PDFs and images so it can be "
+    "pasted into an LLM prompt in one go. "
+)
+
+
+# Function to build a PDF of num_pages text pages. With scanned=True every
+# page is rasterized and stored as an image only, so extraction has to OCR it.
+def make_pdf(num_pages, scanned=False, dpi=150):
+    import fitz  # PyMuPDF
+
+    doc = fitz.open()
+    for page_num in range(num_pages):
+        page = doc.new_page()
+        page.insert_textbox(
+            fitz.Rect(50, 50, 545, 790),
+            f"Page {page_num + 1}\n\n" + LOREM * 12,
+            fontsize=11,
+        )
+    if not scanned:
+        return doc.tobytes()
+
+    scanned_doc = fitz.open()
+    for page in doc:
+        pix = page.get_pixmap(dpi=dpi)
+        new_page = scanned_doc.new_page(width=page.rect.width, height=page.rect.height)
+        new_page.insert_image(new_page.rect, pixmap=pix)
+    return scanned_doc.tobytes()
+
+
+# Function to build num_images PNG screenshots of text in a few sizes, so
+# batched OCR has more than one size group to deal with
+def make_images(num_images):
+    import io
+
+    from PIL import Image, ImageDraw
+
+    sizes = [(640, 360), (800, 600), (1024, 768)]
+    images = []
+    for i in range(num_images):
+        image = Image.new("RGB", sizes[i % len(sizes)], "white")
+        draw = ImageDraw.Draw(image)
+        for line in range(8):
+            draw.text((20, 20 + line * 30), f"Image {i + 1} line {line + 1}: {LOREM[:60]}", fill="black")
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        images.append(buffer.getvalue())
+    return images
+
+
+# Function to build a web page with an article of paragraphs paragraphs
+# wrapped in the navigation, sidebar, footer and script boilerplate real sites
+# carry, so main-content extraction has something to drop
+def make_html_page(number, paragraphs=20):
+    links = "".join(f'<li><a href="/section/{i}">Section {i}</a></li>' for i in range(30))
+    article = "".join(
+        f"<p>Paragraph {i + 1} of page {number}. {LOREM * 4}</p>" for i in range(paragraphs)
+    )
+    return (
+        f"<html><head><title>Page {number}</title>"
+        "<script>window.analytics = {track: function () {}};</script>"
+        "<style>body { font-family: sans-serif; }</style></head><body>"
+        f"<header><nav><ul>{links}</ul></nav></header>"
+        f"<main><article><h1>Page {number}</h1>{article}</article></main>"
+        f"<aside><h2>Related</h2><ul>{links}</ul></aside>"
+        "<footer>Copyright Copy Pasta. All rights reserved. Privacy | Terms</footer>"
+        "</body></html>"
+    ).encode("utf-8")
+
+
+# Stand-in for youtube_transcript_api.YouTubeTranscriptApi that replays a
+# recording (benchmarks/fixtures/youtube_recording.json by default) with an
+# artificial latency per call. Videos missing from the recording fail the way
+# a video with transcripts disabled does.
+class RecordedTranscriptApi:
+    def __init__(self, path=None, latency=0.0):
+        import json
+        import os
+
+        path = path or os.path.join(
+            os.path.dirname(__file__), "fixtures", "youtube_recording.json"
+        )
+        with open(path) as f:
+            self.recording = json.load(f)
+        self.latency = latency
+        self.calls = 0
+
+    def get_transcript(self, video_id, languages=("en",)):
+        import time
+
+        self.calls += 1
+        time.sleep(self.latency)
+        if video_id not in self.recording["transcripts"]:
+            raise RuntimeError(f"Transcripts are disabled for video {video_id}")
+        return self.recording["transcripts"][video_id]
+
+    # Replays the recorded playlist page for resolve_video_ids
+    def download_page(self, url):
+        return self.recording["playlist_page"]
+
+
+# Function to build num_images "phone photos" of text with their ground
+# truth: low-contrast text on a tinted page, scaled up, tilted a few degrees
+# and framed by a dark desk border, with sensor noise
+def make_photo_images(num_images, seed=0):
+    import io
+
+    import numpy as np
+    from PIL import Image, ImageDraw, ImageFont
+
+    rng = np.random.default_rng(seed)
+    try:
+        font = ImageFont.load_default(size=18)
+    except TypeError:  # Pillow < 10.1 has only the small bitmap font
+        font = ImageFont.load_default()
+    words = LOREM.split()
+    photos = []
+    for i in range(num_images):
+        lines = [
+            " ".join(words[(i + line * 7) % len(words) :][:7]) for line in range(6)
+        ]
+        page = Image.new("RGB", (640, 260), (226, 214, 190))
+        draw = ImageDraw.Draw(page)
+        for line, text in enumerate(lines):
+            draw.text((24, 20 + line * 38), text, fill=(92, 84, 80), font=font)
+
+        page = page.resize((page.width * 3, page.height * 3), Image.BICUBIC)
+        page = page.rotate(
+            rng.uniform(-6, 6), resample=Image.BICUBIC, expand=True, fillcolor=(40, 36, 34)
+        )
+        photo = Image.new("RGB", (page.width + 240, page.height + 240), (40, 36, 34))
+        photo.paste(page, (120, 120))
+
+        pixels = np.asarray(photo).astype(np.int16)
+        pixels += rng.normal(0, 6, pixels.shape).astype(np.int16)
+        photo = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+        buffer = io.BytesIO()
+        photo.save(buffer, format="JPEG", quality=90)
+        photos.append((buffer.getvalue(), " ".join(lines)))
+    return photos
+
+
+# Stand-in OCR engine for the OCR service benchmark: costs a fixed overhead
+# per batch plus a little per image, like a model call, and returns each
+# image's size as its "text"
+def fake_ocr_batch(images, overhead=0.05, per_image=0.01):
+    import time
+
+    time.sleep(overhead + per_image * len(images))
+    return [f"{image.shape[0]}x{image.shape[1]}" for image in images]
@@ -0,0 +1,79 @@
+# Wall time of extracting a list of links one after another against the
+# asyncio bulk extractor, using a local HTTP server that serves generated
+# web pages with artificial latency. Half the links use 127.0.0.1 and half
+# localhost, so the per-host limit applies to two hosts. The cache is turned
+# off so every run fetches.
+#
+#   python benchmarks/bench_bulk_urls.py --urls 40 --latency 0.2 --per-host 2 4 8
+import argparse
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+os.environ["COPYPASTA_CACHE_DIR"] = ""
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from copypasta.bulk import extract_urls  # noqa: E402
+from copypasta.extract import extract_url  # noqa: E402
+from _fixtures import make_html_page  # noqa: E402
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        time.sleep(self.server.latency)
+        body = make_html_page(self.path.rsplit("/", 1)[-1])
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--urls", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--per-host", type=int, nargs="+", default=[2, 4, 8])
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.daemon_threads = True
+    server.latency = args.latency
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    urls = [
+        f"http://{'127.0.0.1' if i % 2 else 'localhost'}:{port}/page/{i}"
+        for i in range(args.urls)
+    ]
+
+    try:
+        started = time.perf_counter()
+        expected = [extract_url(url) for url in urls]
+        sequential = time.perf_counter() - started
+        print(f"{'mode':>18} {'wall s':>8} {'urls/s':>8}")
+        print(f"{'sequential':>18} {sequential:>8.2f} {len(urls) / sequential:>8.1f}")
+
+        for per_host in args.per_host:
+            started = time.perf_counter()
+            results = extract_urls(urls, per_host=per_host)
+            elapsed = time.perf_counter() - started
+            assert [result.text for result in results] == expected, "results out of order"
+            slowest = max(result.seconds for result in results)
+            print(
+                f"{f'bulk, {per_host}/host':>18} {elapsed:>8.2f} "
+                f"{len(urls) / elapsed:>8.1f}  (slowest url {slowest:.2f}s)"
+            )
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# Milliseconds per page and output size of each way of turning HTML into
+# text, over a directory of saved pages (.html / .htm files, e.g. saved with
+# "Save Page As" or curl) or, without --corpus, generated pages with the usual
+# navigation and footer boilerplate. "legacy" is the whole-page BeautifulSoup
+# dump the app used before main-content extraction; "stream" is the
+# incremental parser used for huge pages, with no character budget.
+#
+#   python benchmarks/bench_html_extract.py --corpus ~/saved-pages
+#   python benchmarks/bench_html_extract.py --pages 50
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from copypasta.chunking import estimate_tokens  # noqa: E402
+from copypasta.html_extract import soup_text, stream_html_text, trafilatura_text  # noqa: E402
+from _fixtures import make_html_page  # noqa: E402
+
+
+def legacy_text(html):
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    return re.sub(r"\s+", " ", soup.get_text(separator=" ", strip=True))
+
+
+ENGINES = {
+    "legacy": legacy_text,
+    "soup full": lambda html: soup_text(html, main_only=False),
+    "soup main": lambda html: soup_text(html, main_only=True),
+    "trafilatura": lambda html: trafilatura_text(html) or "",
+    "stream": lambda html: stream_html_text([html], max_chars=0),
+}
+
+
+def load_corpus(corpus, pages):
+    if not corpus:
+        return [make_html_page(i) for i in range(pages)]
+    paths = sorted(
+        glob.glob(os.path.join(corpus, "**", "*.htm*"), recursive=True)
+    )
+    documents = []
+    for path in paths:
+        with open(path, "rb") as f:
+            documents.append(f.read())
+    return documents
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", help="directory of saved .html pages")
+    parser.add_argument("--pages", type=int, default=50, help="generated pages without --corpus")
+    parser.add_argument("--engines", nargs="+", choices=list(ENGINES), default=list(ENGINES))
+    parser.add_argument("--budget", type=int, default=100_000, help="characters for the memory check")
+    args = parser.parse_args()
+
+    documents = load_corpus(args.corpus, args.pages)
+    if not documents:
+        sys.exit(f"No .html files under {args.corpus}")
+    input_bytes = sum(len(document) for document in documents)
+    print(f"{len(documents)} pages, {input_bytes / len(documents) / 1024:.1f} KiB average")
+    print(f"{'engine':>12} {'ms/page':>8} {'chars/page':>11} {'tokens/page':>12}")
+
+    for name in args.engines:
+        extract = ENGINES[name]
+        started = time.perf_counter()
+        texts = [extract(document) for document in documents]
+        elapsed = time.perf_counter() - started
+        chars = sum(len(text) for text in texts) / len(texts)
+        tokens = sum(estimate_tokens(text) for text in texts) / len(texts)
+        print(
+            f"{name:>12} {elapsed * 1000 / len(documents):>8.2f} "
+            f"{chars:>11.0f} {tokens:>12.0f}"
+        )
+
+    # Peak memory of the incremental parser on the whole corpus as one huge
+    # page, fed in 64 KiB chunks: it should depend on the budget, not the size
+    huge = b"".join(documents)
+    chunks = (huge[i : i + 65536] for i in range(0, len(huge), 65536))
+    tracemalloc.start()
+    text = stream_html_text(chunks, max_chars=args.budget)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(
+        f"stream over one {len(huge) / 2**20:.1f} MiB page, {args.budget} char budget: "
+        f"{len(text)} chars, peak {peak / 1024:.0f} KiB"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# Load test of the LLM backend router against local mock servers with
+# different latencies. Sends a burst of requests through the router, reports
+# throughput and how the requests were spread, then stops the fastest server
+# and checks requests fail over to the others. Runs fully offline.
+#
+#   python benchmarks/bench_llm_backends.py --requests 60 --latency 0.05 0.2 --concurrency 8
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from copypasta.backends import BackendRouter, MockBackend  # noqa: E402
+from copypasta.mock_llm import MockLLMServer, mock_reply  # noqa: E402
+
+
+def run(router, prompts, concurrency):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        replies = list(executor.map(router.complete, prompts))
+    elapsed = time.perf_counter() - started
+    assert replies == [mock_reply(prompt) for prompt in prompts]
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=60)
+    parser.add_argument("--latency", type=float, nargs="+", default=[0.05, 0.2])
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--strategy", choices=["latency", "throughput", "ordered"], default="latency"
+    )
+    args = parser.parse_args()
+
+    prompts = [f"request {i} " + "lorem ipsum " * 50 for i in range(args.requests)]
+    servers = [MockLLMServer(latency=latency).start() for latency in args.latency]
+    running = list(servers)
+    try:
+        backends = [
+            MockBackend(server.url, model_name=f"mock-{latency}", timeout=10)
+            for server, latency in zip(servers, args.latency)
+        ]
+        router = BackendRouter(backends, strategy=args.strategy)
+
+        elapsed = run(router, prompts, args.concurrency)
+        print(
+            f"{args.requests} requests in {elapsed:.2f}s "
+            f"({args.requests / elapsed:.1f} req/s, strategy {args.strategy})"
+        )
+        print(f"{'backend':>12} {'requests':>9} {'latency s':>10} {'chars/s':>9}")
+        for backend in backends:
+            print(
+                f"{backend.model_name:>12} {backend.requests:>9} "
+                f"{backend.latency:>10.3f} {backend.throughput:>9.0f}"
+            )
+
+        streamed = "".join(router.stream(prompts[0]))
+        assert streamed == mock_reply(prompts[0]), "streamed reply differs"
+        print("streaming: ok")
+
+        fastest = min(range(len(backends)), key=lambda i: args.latency[i])
+        if len(servers) > 1:
+            running.remove(servers[fastest])
+            servers[fastest].stop()
+            elapsed = run(router, prompts[:10], args.concurrency)
+            print(
+                f"failover: 10 requests in {elapsed:.2f}s with "
+                f"{backends[fastest].model_name} down "
+                f"({backends[fastest].failures} failed attempts)"
+            )
+    finally:
+        for server in running:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
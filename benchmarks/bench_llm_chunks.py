@@ -0,0 +1,48 @@
+# Wall time of running chunks through an LLM one at a time against running
+# them with bounded concurrency, using the local mock server with artificial
+# latency. Also checks the concurrent run keeps "# Page N" order.
+#
+#   python benchmarks/bench_llm_chunks.py --chunks 10 --latency 0.5 --concurrency 1 4 10
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from copypasta.backends import MockBackend  # noqa: E402
+from copypasta.llm_pipeline import join_pages, map_chunks  # noqa: E402
+from copypasta.mock_llm import MockLLMServer, mock_reply  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 10])
+    args = parser.parse_args()
+
+    chunks = [f"chunk {i} " + "lorem ipsum " * 100 for i in range(args.chunks)]
+    expected = join_pages([mock_reply(chunk) for chunk in chunks])
+
+    with MockLLMServer(latency=args.latency) as server:
+        backend = MockBackend(server.url)
+        print(f"{'concurrency':>11} {'wall s':>8} {'chunks/s':>9}")
+        for concurrency in args.concurrency:
+            progress = []
+            started = time.perf_counter()
+            replies = map_chunks(
+                chunks,
+                backend.complete,
+                concurrency,
+                lambda done, total, index: progress.append(done),
+            )
+            elapsed = time.perf_counter() - started
+
+            assert join_pages(replies) == expected, "pages came back out of order"
+            assert progress == list(range(1, len(chunks) + 1))
+            print(f"{concurrency:>11} {elapsed:>8.2f} {len(chunks) / elapsed:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
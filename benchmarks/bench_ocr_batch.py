@@ -0,0 +1,43 @@
+# Images/sec for one-at-a-time OCR against batched OCR on a generated upload.
+#
+#   python benchmarks/bench_ocr_batch.py --images 50 --batch-size 8
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from copypasta.ocr import (  # noqa: E402
+    extract_text_from_image,
+    extract_text_from_images,
+    load_easyocr_model,
+)
+from _fixtures import make_images  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=8)
+    args = parser.parse_args()
+
+    images = make_images(args.images)
+    load_easyocr_model()  # keep model start-up out of both timings
+
+    started = time.perf_counter()
+    for image_bytes in images:
+        extract_text_from_image(image_bytes)
+    single = time.perf_counter() - started
+
+    started = time.perf_counter()
+    extract_text_from_images(images, batch_size=args.batch_size)
+    batched = time.perf_counter() - started
+
+    print(f"{'mode':>8} {'images/s':>10}")
+    print(f"{'single':>8} {args.images / single:>10.2f}")
+    print(f"{'batched':>8} {args.images / batched:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# OCR time and accuracy per preprocessing profile on generated phone photos
+# of text with known content. Accuracy is the similarity (0-1) between the
+# OCR output and the ground truth, ignoring case and spacing. Without easyocr
+# installed only the preprocessing itself is timed.
+#
+#   python benchmarks/bench_ocr_preprocess.py --images 20 --profiles off screenshot photo
+import argparse
+import difflib
+import importlib.util
+import io
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from copypasta import config  # noqa: E402
+from copypasta.preprocess import preprocess  # noqa: E402
+from _fixtures import make_photo_images  # noqa: E402
+
+
+def similarity(text, truth):
+    def normalize(value):
+        return " ".join(value.lower().split())
+
+    return difflib.SequenceMatcher(None, normalize(text), normalize(truth)).ratio()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=20)
+    parser.add_argument(
+        "--profiles", nargs="+", choices=list(config.PREPROCESS_PROFILES),
+        default=list(config.PREPROCESS_PROFILES),
+    )
+    args = parser.parse_args()
+
+    photos = make_photo_images(args.images)
+    decoded = [np.array(Image.open(io.BytesIO(data)).convert("RGB")) for data, _ in photos]
+    run_ocr = importlib.util.find_spec("easyocr") is not None
+    if run_ocr:
+        from copypasta.ocr import extract_text_from_array, load_easyocr_model
+
+        load_easyocr_model()  # keep model start-up out of the timings
+    else:
+        print("easyocr not installed: timing preprocessing only")
+
+    print(f"{'profile':>10} {'prep ms':>8} {'ocr ms':>8} {'pixels':>10} {'accuracy':>9}")
+    for name in args.profiles:
+        options = config.PREPROCESS_PROFILES[name]
+        started = time.perf_counter()
+        prepared = [preprocess(image_np, options) for image_np in decoded]
+        prep_ms = (time.perf_counter() - started) * 1000 / len(decoded)
+        pixels = sum(image.shape[0] * image.shape[1] for image in prepared) / len(prepared)
+
+        ocr_ms, accuracy = float("nan"), float("nan")
+        if run_ocr:
+            started = time.perf_counter()
+            texts = [extract_text_from_array(image) for image in prepared]
+            ocr_ms = (time.perf_counter() - started) * 1000 / len(prepared)
+            accuracy = sum(
+                similarity(text, truth) for text, (_, truth) in zip(texts, photos)
+            ) / len(photos)
+        print(
+            f"{name:>10} {prep_ms:>8.1f} {ocr_ms:>8.1f} {pixels:>10.0f} {accuracy:>9.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
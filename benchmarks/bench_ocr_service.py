@@ -0,0 +1,81 @@
+# Throughput of the OCR service when several sessions submit images at once,
+# with and without the batching window, and how many submissions a small
+# queue turns away under load. Uses a stand-in OCR engine with a fixed cost
+# per batch so it runs without EasyOCR; pass --real to use the model.
+#
+#   python benchmarks/bench_ocr_service.py --sessions 8 --images 10 --windows 0 25
+import argparse
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from copypasta import config  # noqa: E402
+from copypasta.errors import ExtractionError  # noqa: E402
+from copypasta.ocr_service import OCRService  # noqa: E402
+from _fixtures import fake_ocr_batch  # noqa: E402
+
+
+# Function to run sessions threads that each OCR images images through
+# service. Returns (seconds, images done, submissions refused).
+def run_sessions(service, sessions, images):
+    done = [0]
+    refused = [0]
+    lock = threading.Lock()
+
+    def session(number):
+        arrays = [np.full((200 + number, 300), 255, np.uint8) for _ in range(images)]
+        try:
+            for index, text in service.iter_text(arrays):
+                assert text == f"{200 + number}x300", text
+                with lock:
+                    done[0] += 1
+        except ExtractionError:
+            with lock:
+                refused[0] += 1
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started, done[0], refused[0]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--images", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--windows", type=int, nargs="+", default=[0, 25])
+    parser.add_argument("--real", action="store_true", help="use EasyOCR")
+    args = parser.parse_args()
+    ocr_batch = None if args.real else fake_ocr_batch
+
+    print(f"{'window ms':>9} {'wall s':>8} {'images/s':>9}")
+    for window in args.windows:
+        service = OCRService(args.workers, ocr_batch=ocr_batch, batch_window_ms=window)
+        run_sessions(service, 1, 1)  # workers up and model loaded
+        elapsed, done, _ = run_sessions(service, args.sessions, args.images)
+        service.stop()
+        print(f"{window:>9} {elapsed:>8.2f} {done / elapsed:>9.1f}")
+
+    # Backpressure: a queue of 4 with a 1 second submit timeout
+    config.OCR_SUBMIT_TIMEOUT = 1
+    service = OCRService(args.workers, queue_depth=4, ocr_batch=ocr_batch)
+    run_sessions(service, 1, 1)
+    elapsed, done, refused = run_sessions(service, args.sessions * 4, args.images)
+    service.stop()
+    print(
+        f"queue depth 4: {done} images done, {refused} of {args.sessions * 4} "
+        f"sessions refused in {elapsed:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+# Compare serial and page-parallel PDF extraction across page counts.
+#
+#   python benchmarks/bench_pdf_parallel.py --pages 8 32 128 --workers 4 --scanned
+import argparse
+import os
+import sys
+import time
+
+# No extraction cache: the parallel run would otherwise just read back the
+# pages the serial run cached. Set before import so pool workers inherit it.
+os.environ["COPYPASTA_CACHE_DIR"] = ""
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from copypasta.pdf import extract_text_from_pdf, extract_text_from_pdf_parallel, open_pdf  # noqa: E402
+from _fixtures import make_pdf  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, nargs="+", default=[8, 32, 128])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--scanned", action="store_true", help="force OCR on every page")
+    args = parser.parse_args()
+
+    print(f"{'pages':>6} {'serial s':>10} {'parallel s':>11} {'speedup':>8}")
+    for num_pages in args.pages:
+        pdf_bytes = make_pdf(num_pages, scanned=args.scanned)
+
+        started = time.perf_counter()
+        serial_text = extract_text_from_pdf(open_pdf(pdf_bytes), 1, num_pages)
+        serial = time.perf_counter() - started
+
+        started = time.perf_counter()
+        parallel_text = extract_text_from_pdf_parallel(
+            pdf_bytes, 1, num_pages, workers=args.workers
+        )
+        parallel = time.perf_counter() - started
+
+        assert parallel_text == serial_text, "parallel output differs from serial"
+        print(f"{num_pages:>6} {serial:>10.2f} {parallel:>11.2f} {serial / parallel:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
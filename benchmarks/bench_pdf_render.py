@@ -0,0 +1,69 @@
+# Per-page time and peak Python memory of the old PyPDF2 -> PdfWriter ->
+# PyMuPDF -> PNG round trip against rendering straight to a NumPy array.
+# Pass --ocr to include the OCR call itself (loads the EasyOCR model).
+#
+#   python benchmarks/bench_pdf_render.py --pages 20
+import argparse
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+import PyPDF2  # noqa: E402
+import fitz  # noqa: E402
+import numpy as np  # noqa: E402
+from PIL import Image  # noqa: E402
+
+from copypasta.ocr import extract_text_from_array  # noqa: E402
+from copypasta.pdf import open_pdf, render_page  # noqa: E402
+from _fixtures import make_pdf  # noqa: E402
+
+
+# The rendering path pages used before the direct path existed
+def legacy_render(pdf_reader, page_num):
+    pdf_bytes = io.BytesIO()
+    pdf_writer = PyPDF2.PdfWriter()
+    pdf_writer.add_page(pdf_reader.pages[page_num])
+    pdf_writer.write(pdf_bytes)
+    pdf_bytes.seek(0)
+    doc = fitz.open(stream=pdf_bytes.read(), filetype="pdf")
+    pix = doc.load_page(0).get_pixmap()
+    image = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+    img_byte_arr = io.BytesIO()
+    image.save(img_byte_arr, format="PNG")
+    return np.array(Image.open(io.BytesIO(img_byte_arr.getvalue())))
+
+
+def measure(label, render, num_pages, ocr):
+    tracemalloc.start()
+    started = time.perf_counter()
+    for page_num in range(num_pages):
+        image_np = render(page_num)
+        if ocr:
+            extract_text_from_array(image_np)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:>8} {elapsed / num_pages * 1000:>10.1f} {peak / 1024 / 1024:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--ocr", action="store_true")
+    args = parser.parse_args()
+
+    pdf_bytes = make_pdf(args.pages, scanned=True)
+    pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
+    pdf_document = open_pdf(pdf_bytes)
+
+    print(f"{'path':>8} {'ms/page':>10} {'peak MiB':>10}")
+    measure("legacy", lambda n: legacy_render(pdf_reader, n), args.pages, args.ocr)
+    measure("direct", lambda n: render_page(pdf_document, n), args.pages, args.ocr)
+
+
+if __name__ == "__main__":
+    main()
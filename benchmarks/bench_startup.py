@@ -0,0 +1,54 @@
+# Cold-start cost of the package: time to import it in a fresh interpreter,
+# which third-party modules that pulls in, and how long the first OCR model
+# load takes on top.
+#
+#   python benchmarks/bench_startup.py [--ocr]
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+
+HEAVY = [
+    "easyocr",
+    "torch",
+    "fitz",
+    "PyPDF2",
+    "bs4",
+    "trafilatura",
+    "youtube_transcript_api",
+]
+
+SCRIPT = """
+import sys, time
+started = time.perf_counter()
+import copypasta, copypasta.extract
+imported = time.perf_counter() - started
+loaded = [name for name in {heavy!r} if name in sys.modules]
+ocr = 0.0
+if {ocr!r}:
+    started = time.perf_counter()
+    copypasta.load_easyocr_model()
+    ocr = time.perf_counter() - started
+print(f"import copypasta:   {{imported * 1000:8.1f}} ms")
+print(f"heavy modules:      {{', '.join(loaded) or 'none'}}")
+if {ocr!r}:
+    print(f"first OCR load:     {{ocr * 1000:8.1f}} ms")
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ocr", action="store_true", help="also time the OCR model load")
+    args = parser.parse_args()
+
+    subprocess.run(
+        [sys.executable, "-c", SCRIPT.format(heavy=HEAVY, ocr=args.ocr)],
+        cwd=ROOT,
+        check=True,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# Batch transcript extraction for a playlist, replayed from a recording so it
+# runs offline: resolves the playlist's video IDs from the recorded page,
+# fetches the transcripts one at a time and with bounded concurrency, then
+# checks a second run is served entirely from the persistent cache.
+#
+#   python benchmarks/bench_youtube_batch.py --latency 0.3 --concurrency 1 4 8
+#   python benchmarks/bench_youtube_batch.py --record <playlist url>
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+# Each run gets a fresh cache so the first pass always reaches the "API"
+os.environ["COPYPASTA_CACHE_DIR"] = tempfile.mkdtemp(prefix="copypasta-bench-")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from copypasta import cache  # noqa: E402
+from copypasta.youtube import (  # noqa: E402
+    _download_page,
+    extract_youtube_collection,
+    fetch_transcripts,
+    resolve_video_ids,
+)
+from _fixtures import RecordedTranscriptApi  # noqa: E402
+
+RECORDING = os.path.join(os.path.dirname(__file__), "fixtures", "youtube_recording.json")
+
+
+# Function to record a playlist page and its transcripts from the real
+# services into the fixture file (needs network access)
+def record(playlist_url):
+    from youtube_transcript_api import YouTubeTranscriptApi
+
+    page = _download_page(playlist_url)
+    video_ids = resolve_video_ids(playlist_url, lambda url: page)
+    results = fetch_transcripts(video_ids, api=YouTubeTranscriptApi)
+    # The fetched Transcript objects are written back in the API's format
+    transcripts = {
+        video_id: [
+            {"text": text, "start": start, "duration": duration}
+            for text, start, duration in zip(
+                transcript.texts, transcript.starts, transcript.durations
+            )
+        ]
+        for video_id, transcript, error in results
+        if transcript is not None
+    }
+    with open(RECORDING, "w") as f:
+        recording = {
+            "playlist_url": playlist_url,
+            "playlist_page": page,
+            "transcripts": transcripts,
+        }
+        json.dump(recording, f, indent=1)
+    print(f"Recorded {len(transcripts)} of {len(video_ids)} transcripts to {RECORDING}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--record", metavar="PLAYLIST_URL")
+    args = parser.parse_args()
+    if args.record:
+        record(args.record)
+        return
+
+    api = RecordedTranscriptApi(RECORDING, latency=args.latency)
+    playlist_url = api.recording["playlist_url"]
+    video_ids = resolve_video_ids(playlist_url, api.download_page)
+    print(f"{len(video_ids)} videos in the recorded playlist")
+
+    print(f"{'concurrency':>11} {'wall s':>8} {'videos/s':>9} {'failed':>7}")
+    for concurrency in args.concurrency:
+        cache.get_cache().clear()
+        started = time.perf_counter()
+        results = fetch_transcripts(video_ids, concurrency=concurrency, api=api)
+        elapsed = time.perf_counter() - started
+        assert [video_id for video_id, _, _ in results] == video_ids, "out of order"
+        failed = sum(1 for _, transcript, _ in results if transcript is None)
+        print(f"{concurrency:>11} {elapsed:>8.2f} {len(video_ids) / elapsed:>9.2f} {failed:>7}")
+
+    calls = api.calls
+    started = time.perf_counter()
+    text = extract_youtube_collection(playlist_url, api=api, download_page=api.download_page)
+    elapsed = time.perf_counter() - started
+    missing = [video_id for video_id, transcript, _ in results if transcript is None]
+    assert api.calls - calls == len(missing), "cached transcripts were refetched"
+    print(
+        f"cached run: {elapsed * 1000:.1f} ms, {len(text)} chars, "
+        f"{api.calls - calls} API calls (videos without transcripts only)"
+    )
+
+    transcript = next(transcript for _, transcript, _ in results if transcript)
+    print("time-sliced (60s):")
+    print(transcript.time_sliced(60)[:300] + " ...")
+
+
+if __name__ == "__main__":
+    main()
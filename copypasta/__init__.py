@@ -0,0 +1,95 @@
+# Copy Pasta extraction engine. The Streamlit pages and the CLI all call into
+# this package so the OCR model, caches and HTTP session are shared per process.
+# Heavy dependencies (easyocr/torch, PyMuPDF, PyPDF2, bs4, trafilatura,
+# youtube_transcript_api) are imported inside the functions that need them, so
+# importing the package stays cheap.
+
+from .errors import CopypastaError, ExtractionError, JobCancelled, LLMError
+from .youtube import (
+    Transcript,
+    extract_video_id,
+    extract_youtube_collection,
+    extract_youtube_transcript,
+    fetch_transcripts,
+)
+from .ocr import (
+    load_easyocr_model,
+    warm_up,
+    extract_text_from_image,
+    extract_text_from_array,
+    extract_text_from_images,
+    extract_text_from_arrays,
+    iter_text_from_arrays,
+)
+from .pdf import (
+    PdfDocument,
+    open_pdf,
+    render_page,
+    extract_page_text,
+    extract_text_from_pdf,
+    extract_text_from_pdf_parallel,
+    extract_text_from_pdf_image,
+    iter_pdf_pages,
+)
+from .pdf_classify import PageDecision, classify_page, choose_dpi
+from .fetch import get_session, fetch
+from .web import extract_text_from_url
+from .llm import load_llm_keys, call_llm
+from .cache import get_cache
+from .extract import (
+    extract_pdf,
+    extract_image,
+    extract_images,
+    iter_pdf,
+    iter_images,
+    extract_url,
+    extract_source,
+)
+from .bulk import extract_urls, parse_urls
+from .jobs import get_job_manager
+
+__all__ = [
+    "CopypastaError",
+    "ExtractionError",
+    "LLMError",
+    "JobCancelled",
+    "extract_video_id",
+    "extract_youtube_transcript",
+    "extract_youtube_collection",
+    "fetch_transcripts",
+    "Transcript",
+    "load_easyocr_model",
+    "warm_up",
+    "extract_text_from_image",
+    "extract_text_from_array",
+    "extract_text_from_images",
+    "extract_text_from_arrays",
+    "iter_text_from_arrays",
+    "PdfDocument",
+    "open_pdf",
+    "render_page",
+    "extract_page_text",
+    "extract_text_from_pdf",
+    "extract_text_from_pdf_parallel",
+    "extract_text_from_pdf_image",
+    "iter_pdf_pages",
+    "PageDecision",
+    "classify_page",
+    "choose_dpi",
+    "get_session",
+    "fetch",
+    "extract_text_from_url",
+    "load_llm_keys",
+    "call_llm",
+    "get_cache",
+    "extract_pdf",
+    "extract_image",
+    "extract_images",
+    "iter_pdf",
+    "iter_images",
+    "extract_url",
+    "extract_source",
+    "extract_urls",
+    "parse_urls",
+    "get_job_manager",
+]
@@ -0,0 +1,464 @@
+# LLM providers behind one interface. Every backend has complete(prompt) and
+# stream(prompt), its own pooled HTTP session and timeout, and keeps running
+# latency and throughput figures the router uses to pick between them.
+import json
+import logging
+import threading
+import time
+
+import requests
+
+from . import config
+from .cache import cached, content_hash, get_cache, make_key
+from .chunking import chunk_token_budget, estimate_tokens
+from .errors import LLMError
+from .keys import get_key_pool
+
+logger = logging.getLogger(__name__)
+
+# Weight of the newest sample in the running averages
+EWMA_ALPHA = 0.3
+# Seconds a backend is skipped after it fails
+UNHEALTHY_SECONDS = 30.0
+
+
+# Function to build a keep-alive session sized for the LLM concurrency
+def _pooled_session():
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=4, pool_maxsize=max(10, config.LLM_CONCURRENCY * 4)
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# Function to read "data:" payloads out of a server-sent events response
+def _sse_events(response):
+    for line in response.iter_lines(decode_unicode=True):
+        if line and line.startswith("data:"):
+            data = line[len("data:") :].strip()
+            if data == "[DONE]":
+                return
+            yield json.loads(data)
+
+
+class Backend:
+    name = "backend"
+    slots = 1  # requests it can usefully take at once, per LLM_CONCURRENCY
+
+    def __init__(self, model_name, timeout=None):
+        self.model_name = model_name
+        self.timeout = timeout or config.LLM_TIMEOUT
+        self.session = _pooled_session()
+        self.latency = None  # seconds per reply, running average
+        self.throughput = None  # characters per second, running average
+        self.requests = 0
+        self.failures = 0
+        self.unhealthy_until = 0.0
+        self._lock = threading.Lock()
+
+    def complete(self, prompt):
+        raise NotImplementedError
+
+    def stream(self, prompt):
+        raise NotImplementedError
+
+    # Cache key of this backend's reply to prompt. Replies are cached per
+    # provider and model, so one backend's replies are never served as
+    # another's.
+    def reply_key(self, prompt):
+        return make_key(
+            "llm", content_hash(prompt), backend=self.name, model=self.model_name
+        )
+
+    def cached_complete(self, prompt):
+        return cached(
+            self.reply_key(prompt),
+            lambda: self.complete(prompt),
+            ttl=config.LLM_CACHE_TTL,
+            cache=get_cache("llm_responses"),
+        )
+
+    # Generator like stream. A cached reply comes back as one piece; a fresh
+    # one is cached once it has streamed to the end.
+    def cached_stream(self, prompt):
+        cache = get_cache("llm_responses")
+        key = self.reply_key(prompt)
+        reply = cache.get(key)
+        if reply is not None:
+            yield reply
+            return
+
+        pieces = []
+        for piece in self.stream(prompt):
+            pieces.append(piece)
+            yield piece
+        cache.set(key, "".join(pieces), config.LLM_CACHE_TTL)
+
+    @property
+    def healthy(self):
+        return time.monotonic() >= self.unhealthy_until
+
+    def record(self, started, reply):
+        elapsed = max(time.monotonic() - started, 1e-6)
+        with self._lock:
+            self.requests += 1
+            self.latency = _ewma(self.latency, elapsed)
+            self.throughput = _ewma(self.throughput, len(reply) / elapsed)
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.unhealthy_until = time.monotonic() + UNHEALTHY_SECONDS
+
+    def metrics(self):
+        return [
+            {
+                "backend": self.name,
+                "model": self.model_name,
+                "requests": self.requests,
+                "failures": self.failures,
+                "latency_seconds": self.latency,
+                "chars_per_second": self.throughput,
+                "healthy": self.healthy,
+            }
+        ]
+
+
+# Function to pull the error message out of an API error response
+def _error_message(response):
+    try:
+        return response.json()["error"]["message"]
+    except (ValueError, KeyError, TypeError):
+        return f"HTTP {response.status_code} {response.text[:200]}"
+
+
+# Function to read the reply text out of a Gemini response. A reply with no
+# text (blocked by safety filters, or cut off) raises LLMError with the
+# reason Gemini gave.
+def _gemini_text(payload):
+    candidate = (payload.get("candidates") or [{}])[0]
+    parts = candidate.get("content", {}).get("parts") or []
+    text = "".join(part.get("text", "") for part in parts)
+    if not text:
+        feedback = payload.get("promptFeedback", {})
+        reason = feedback.get("blockReason") or candidate.get("finishReason")
+        raise LLMError(f"Gemini returned no reply ({reason or 'empty'})")
+    return text
+
+
+def _ewma(average, sample):
+    if average is None:
+        return sample
+    return EWMA_ALPHA * sample + (1 - EWMA_ALPHA) * average
+
+
+class GeminiBackend(Backend):
+    name = "gemini"
+    URL = "https://generativelanguage.googleapis.com/v1beta/models/{model}:{method}"
+    SAFETY_SETTINGS = [
+        {"category": category, "threshold": "BLOCK_NONE"}
+        for category in (
+            "HARM_CATEGORY_HARASSMENT",
+            "HARM_CATEGORY_HATE_SPEECH",
+            "HARM_CATEGORY_SEXUALLY_EXPLICIT",
+            "HARM_CATEGORY_DANGEROUS_CONTENT",
+        )
+    ]
+
+    def __init__(self, api_keys, model_name="gemini-1.5-flash", timeout=None):
+        super().__init__(model_name, timeout)
+        self.pool = get_key_pool(api_keys)
+        self.key_count = self.slots = len(api_keys)
+
+    def _post(self, state, method, prompt, **kwargs):
+        return self.session.post(
+            self.URL.format(model=self.model_name, method=method),
+            headers={"x-goog-api-key": state.key},
+            json={
+                "contents": [{"parts": [{"text": prompt}]}],
+                "safetySettings": self.SAFETY_SETTINGS,
+            },
+            timeout=self.timeout,
+            **kwargs,
+        )
+
+    # Function to hand a key back after a response that isn't a reply.
+    # Returns True when the request should move on to another key: a 429
+    # cools the key down, and a 5xx or a 401/403 (a bad key) counts against
+    # it. Any other 4xx is the request's fault, not the key's, so it raises
+    # LLMError without trying the other keys.
+    def _release_error(self, state, response):
+        status = response.status_code
+        if status == 429:
+            self.pool.release_rate_limited(state)
+            logger.warning("LLM key %d rate limited", state.index)
+            return True
+        if status >= 500 or status in (401, 403):
+            self.pool.release_failed(state)
+            logger.warning("LLM key %d failed: HTTP %d", state.index, status)
+            return True
+        self.pool.release(state)
+        raise LLMError(f"Gemini rejected the request: {_error_message(response)}")
+
+    # Each attempt goes to the least-loaded key in the shared pool; a 429 or a
+    # server or connection error moves the request on to another key. Gemini's
+    # REST API takes the key per request, which the SDK's process-wide
+    # genai.configure can't do safely from several threads.
+    def complete(self, prompt):
+        tokens = estimate_tokens(prompt)
+        last_error = None
+        for attempt in range(2 * self.key_count):
+            state = self.pool.acquire(tokens)
+            started = time.monotonic()
+            try:
+                response = self._post(state, "generateContent", prompt)
+            except requests.RequestException as e:
+                self.pool.release_failed(state)
+                logger.warning("LLM key %d failed: %s", state.index, e)
+                last_error = e
+                continue
+            if response.status_code >= 400:
+                if response.status_code != 429:
+                    last_error = f"HTTP {response.status_code}"
+                self._release_error(state, response)
+                continue
+            self.pool.release(state)
+            try:
+                payload = response.json()
+            except ValueError as e:
+                raise LLMError("Gemini sent a malformed reply") from e
+            text = _gemini_text(payload)
+            self.record(started, text)
+            return text
+
+        self._give_up(last_error)
+
+    # Keys are retried like complete until the first piece arrives; a failure
+    # after that raises LLMError, since part of the reply has been shown
+    def stream(self, prompt):
+        tokens = estimate_tokens(prompt)
+        last_error = None
+        for attempt in range(2 * self.key_count):
+            state = self.pool.acquire(tokens)
+            started = time.monotonic()
+            pieces = []
+            event = {}
+            try:
+                response = self._post(
+                    state,
+                    "streamGenerateContent",
+                    prompt,
+                    params={"alt": "sse"},
+                    stream=True,
+                )
+                with response:
+                    if response.status_code >= 400:
+                        if response.status_code != 429:
+                            last_error = f"HTTP {response.status_code}"
+                        self._release_error(state, response)
+                        continue
+                    for event in _sse_events(response):
+                        for candidate in event.get("candidates", [])[:1]:
+                            for part in candidate.get("content", {}).get("parts", []):
+                                if part.get("text"):
+                                    pieces.append(part["text"])
+                                    yield part["text"]
+            except GeneratorExit:
+                self.pool.release(state)
+                raise
+            except requests.RequestException as e:
+                self.pool.release_failed(state)
+                logger.warning("LLM key %d failed: %s", state.index, e)
+                if pieces:
+                    self.record_failure()
+                    raise LLMError(f"LLM reply was cut off: {e}") from e
+                last_error = e
+                continue
+            except ValueError as e:
+                self.pool.release(state)
+                raise LLMError("Gemini sent a malformed reply") from e
+            self.pool.release(state)
+            if not pieces:
+                # Raises with the block or finish reason of the last event
+                _gemini_text(event)
+            self.record(started, "".join(pieces))
+            return
+
+        self._give_up(last_error)
+
+    # Every attempt failed: only a run of 429s means the keys are out of quota
+    def _give_up(self, last_error):
+        self.record_failure()
+        if last_error is None:
+            raise LLMError("LLM limit reached! Come back another day")
+        raise LLMError(f"Gemini is unavailable: {last_error}")
+
+    def metrics(self):
+        return super().metrics() + [
+            dict(row, backend=self.name) for row in self.pool.metrics()
+        ]
+
+
+# Any server speaking the OpenAI chat completions API: OpenAI, OpenRouter,
+# vLLM, llama.cpp, or the local mock server
+class OpenAICompatibleBackend(Backend):
+    name = "openai"
+
+    def __init__(self, base_url, model_name, api_key=None, timeout=None, headers=None):
+        super().__init__(model_name, timeout)
+        self.base_url = base_url.rstrip("/")
+        self.headers = dict(headers or {})
+        if api_key:
+            self.headers["Authorization"] = f"Bearer {api_key}"
+
+    def _post(self, prompt, stream=False):
+        return self.session.post(
+            f"{self.base_url}/chat/completions",
+            headers=self.headers,
+            json={
+                "model": self.model_name,
+                "messages": [{"role": "user", "content": prompt}],
+                "stream": stream,
+            },
+            timeout=self.timeout,
+            stream=stream,
+        )
+
+    def complete(self, prompt):
+        started = time.monotonic()
+        try:
+            response = self._post(prompt)
+            response.raise_for_status()
+            text = response.json()["choices"][0]["message"]["content"] or ""
+        except Exception as e:
+            self.record_failure()
+            raise LLMError(f"{self.name} request failed: {e}") from e
+        self.record(started, text)
+        return text
+
+    def stream(self, prompt):
+        started = time.monotonic()
+        pieces = []
+        try:
+            with self._post(prompt, stream=True) as response:
+                response.raise_for_status()
+                for event in _sse_events(response):
+                    for choice in event.get("choices", [])[:1]:
+                        piece = choice.get("delta", {}).get("content")
+                        if piece:
+                            pieces.append(piece)
+                            yield piece
+        except GeneratorExit:
+            raise
+        except Exception as e:
+            self.record_failure()
+            raise LLMError(f"{self.name} request failed: {e}") from e
+        self.record(started, "".join(pieces))
+
+
+class MockBackend(OpenAICompatibleBackend):
+    name = "mock"
+
+    def __init__(self, base_url, model_name="mock", timeout=None):
+        super().__init__(base_url, model_name, timeout=timeout)
+
+
+# Picks a backend per request. Unmeasured backends are tried first so each
+# gets a latency figure; after that "latency" prefers the fastest to answer,
+# "throughput" the most characters per second and "ordered" the first one
+# configured. A failing backend is skipped for a while and the request moves
+# on to the next.
+class BackendRouter:
+    name = "router"
+
+    def __init__(self, backends, strategy=None):
+        if not backends:
+            raise LLMError("No LLM backends configured")
+        self.backends = list(backends)
+        self.strategy = strategy or config.LLM_ROUTING
+
+    # The configured model with the smallest chunk budget, so text split for
+    # it fits whichever backend ends up serving each chunk
+    @property
+    def model_name(self):
+        return min(
+            (backend.model_name for backend in self.backends), key=chunk_token_budget
+        )
+
+    @property
+    def slots(self):
+        return sum(backend.slots for backend in self.backends)
+
+    def ranked(self):
+        healthy = [backend for backend in self.backends if backend.healthy]
+        candidates = healthy or self.backends
+        if self.strategy == "ordered":
+            return candidates
+        if self.strategy == "throughput":
+            return sorted(
+                candidates,
+                key=lambda b: -b.throughput if b.throughput is not None else -float("inf"),
+            )
+        return sorted(
+            candidates, key=lambda b: b.latency if b.latency is not None else 0.0
+        )
+
+    # Function to return a reply to prompt already cached by any of the
+    # backends, in the order they would be tried, or None
+    def cached_reply(self, prompt):
+        cache = get_cache("llm_responses")
+        for backend in self.ranked():
+            reply = cache.get(backend.reply_key(prompt))
+            if reply is not None:
+                return reply
+        return None
+
+    def complete(self, prompt):
+        return self._complete(prompt, "complete")
+
+    def cached_complete(self, prompt):
+        reply = self.cached_reply(prompt)
+        if reply is not None:
+            return reply
+        return self._complete(prompt, "cached_complete")
+
+    def stream(self, prompt):
+        return self._stream(prompt, "stream")
+
+    def cached_stream(self, prompt):
+        reply = self.cached_reply(prompt)
+        if reply is not None:
+            yield reply
+            return
+        yield from self._stream(prompt, "cached_stream")
+
+    # Function to send prompt with each backend's method in turn until one
+    # answers
+    def _complete(self, prompt, method):
+        errors = []
+        for backend in self.ranked():
+            try:
+                return getattr(backend, method)(prompt)
+            except LLMError as e:
+                errors.append(f"{backend.name}: {e}")
+        raise LLMError("; ".join(errors))
+
+    def _stream(self, prompt, method):
+        errors = []
+        for backend in self.ranked():
+            started = False
+            try:
+                for piece in getattr(backend, method)(prompt):
+                    started = True
+                    yield piece
+                return
+            except LLMError as e:
+                if started:
+                    raise
+                errors.append(f"{backend.name}: {e}")
+        raise LLMError("; ".join(errors))
+
+    def metrics(self):
+        return [row for backend in self.backends for row in backend.metrics()]
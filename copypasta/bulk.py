@@ -0,0 +1,112 @@
+# Extraction of many URLs at once. An asyncio loop schedules the URLs with a
+# global limit and a per-host limit; each one runs through extract_url (so
+# YouTube links, PDFs, images and web pages are routed and cached exactly as
+# for a single link) on a thread pool, since the fetch layer is blocking.
+import asyncio
+import re
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from . import config
+from .errors import CopypastaError
+from .extract import extract_url
+from .youtube import extract_video_id, is_video_collection
+
+
+class UrlResult:
+    def __init__(self, url, kind, text=None, error=None, seconds=0.0):
+        self.url = url
+        self.kind = kind  # "youtube" or "web"
+        self.text = text
+        self.error = error
+        self.seconds = seconds
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def as_dict(self):
+        return {
+            "url": self.url,
+            "kind": self.kind,
+            "ok": self.ok,
+            "seconds": round(self.seconds, 3),
+            "characters": len(self.text or ""),
+            "error": self.error,
+        }
+
+
+# Function to pull the URLs out of pasted text, one per line or separated by
+# spaces or commas, dropping duplicates but keeping their order
+def parse_urls(text):
+    urls = []
+    for token in re.split(r"[\s,]+", text):
+        if token and token not in urls:
+            urls.append(token)
+    return urls
+
+
+# Every YouTube link shares one limit, whichever youtube.com host it names
+def _host(url):
+    if extract_video_id(url) or is_video_collection(url):
+        return "youtube"
+    return urlsplit(url).netloc.lower()
+
+
+# Any error, such as a corrupt PDF behind the link, ends up on the URL's own
+# result rather than failing the whole batch
+def _extract_one(url):
+    kind = "youtube" if _host(url) == "youtube" else "web"
+    started = time.perf_counter()
+    try:
+        text = extract_url(url)
+        error = None
+    except (CopypastaError, ValueError, OSError) as e:
+        text, error = None, str(e)
+    except Exception as e:
+        text, error = None, f"{type(e).__name__}: {e}"
+    return UrlResult(url, kind, text, error, time.perf_counter() - started)
+
+
+# Coroutine extracting every URL and returning a UrlResult per URL in input
+# order. A URL that fails gets its error on its result instead of stopping
+# the others. progress_callback(done, total, index) runs on the loop thread.
+async def extract_urls_async(
+    urls, concurrency=None, per_host=None, progress_callback=None
+):
+    concurrency = concurrency or config.URL_CONCURRENCY
+    per_host = per_host or config.URL_PER_HOST
+    loop = asyncio.get_running_loop()
+    overall = asyncio.Semaphore(concurrency)
+    hosts = defaultdict(lambda: asyncio.Semaphore(per_host))
+    done = 0
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+
+        async def run(index, url):
+            nonlocal done
+            async with hosts[_host(url)], overall:
+                result = await loop.run_in_executor(executor, _extract_one, url)
+            done += 1
+            if progress_callback:
+                progress_callback(done, len(urls), index)
+            return result
+
+        return await asyncio.gather(*(run(i, url) for i, url in enumerate(urls)))
+
+
+# Function to run extract_urls_async from synchronous code such as a
+# Streamlit script or the CLI
+def extract_urls(urls, concurrency=None, per_host=None, progress_callback=None):
+    return asyncio.run(
+        extract_urls_async(urls, concurrency, per_host, progress_callback)
+    )
+
+
+# Function to join the text of the URLs that worked, a "# url" section each
+def join_results(results):
+    return "\n\n".join(
+        f"# {result.url}\n{result.text}" for result in results if result.ok
+    )
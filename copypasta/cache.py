@@ -0,0 +1,271 @@
+# Persistent, content-addressed store for extraction results. Entries live in
+# a single sqlite file, are evicted least-recently-used once the store grows
+# past its byte budget, and may carry an expiry time. The cache is best
+# effort: several processes share the file, and a database error is logged
+# and treated as a miss rather than failing an extraction that already
+# finished.
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from . import config
+
+logger = logging.getLogger(__name__)
+
+# Seconds a write waits for another process to release the database
+BUSY_TIMEOUT = 5
+# Access times of hits are written in batches of this many, or once this many
+# seconds have passed, instead of one write per hit
+TOUCH_BATCH = 64
+TOUCH_INTERVAL = 30
+# The running size total is checked against the file every this many writes,
+# since other processes write to it too
+RESYNC_SETS = 256
+
+
+# Function to hash raw content (bytes or str) for use in a cache key
+def content_hash(content):
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.sha256(content).hexdigest()
+
+
+# Function to hash a file on disk the same way as content_hash, reading it a
+# block at a time
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# Function to build a cache key from the kind of extraction, the hash of its
+# input and the options that change its output
+def make_key(kind, digest, **options):
+    payload = json.dumps(
+        [config.EXTRACTOR_VERSION, kind, digest, options], sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ExtractionCache:
+    def __init__(self, path, max_bytes):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._touched = {}
+        self._touched_at = time.monotonic()
+        self._sets = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(
+            path, timeout=BUSY_TIMEOUT, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " accessed REAL NOT NULL,"
+            " expires REAL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)"
+        )
+        self._conn.commit()
+        self._size = self._total_size()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT value, expires FROM entries WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and row[1] is not None and row[1] <= now:
+                    # Expired entries are dropped by the next eviction
+                    row = None
+                if row is not None:
+                    self._touch(key, now)
+            except sqlite3.Error as e:
+                self._rollback()
+                self._failed("read", e)
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[0]
+
+    def set(self, key, value, ttl=None):
+        now = time.time()
+        expires = now + ttl if ttl else None
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            try:
+                old = self._conn.execute(
+                    "SELECT size FROM entries WHERE key = ?", (key,)
+                ).fetchone()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, size, accessed, expires)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (key, value, size, now, expires),
+                )
+                self._touched.pop(key, None)
+                self._size += size - (old[0] if old else 0)
+                self._sets += 1
+                if self._size > self.max_bytes or self._sets % RESYNC_SETS == 0:
+                    self._evict(now)
+                self._flush_touched()
+                self._conn.commit()
+            except sqlite3.Error as e:
+                self._rollback()
+                self._failed("write", e)
+
+    # Records a hit's access time, writing them out a batch at a time. Called
+    # with the lock held.
+    def _touch(self, key, now):
+        self._touched[key] = now
+        if (
+            len(self._touched) >= TOUCH_BATCH
+            or time.monotonic() - self._touched_at >= TOUCH_INTERVAL
+        ):
+            self._flush_touched()
+            self._conn.commit()
+
+    def _flush_touched(self):
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE entries SET accessed = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._touched.items()],
+            )
+            self._touched.clear()
+        self._touched_at = time.monotonic()
+
+    def _total_size(self):
+        return self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()[0]
+
+    # Drop expired entries, then the least recently used ones until the store
+    # fits in max_bytes. Also resyncs the running size total with the file.
+    def _evict(self, now):
+        self._conn.execute(
+            "DELETE FROM entries WHERE expires IS NOT NULL AND expires <= ?", (now,)
+        )
+        total = self._total_size()
+        if total > self.max_bytes:
+            rows = self._conn.execute("SELECT key, size FROM entries ORDER BY accessed")
+            stale = []
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                stale.append((key,))
+                total -= size
+            self._conn.executemany("DELETE FROM entries WHERE key = ?", stale)
+        self._size = total
+
+    def _rollback(self):
+        try:
+            self._conn.rollback()
+        except sqlite3.Error:
+            pass
+
+    def _failed(self, action, error):
+        logger.warning("Cache %s failed on %s: %s", action, self.path, error)
+
+    def clear(self):
+        with self._lock:
+            try:
+                self._conn.execute("DELETE FROM entries")
+                self._conn.commit()
+                self._touched.clear()
+                self._size = 0
+            except sqlite3.Error as e:
+                self._rollback()
+                self._failed("clear", e)
+
+    def stats(self):
+        with self._lock:
+            try:
+                (entries,) = self._conn.execute(
+                "SELECT COUNT(*) FROM entries"
+            ).fetchone()
+            except sqlite3.Error as e:
+                self._failed("read", e)
+                entries = 0
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "bytes": self._size,
+        }
+
+
+# A cache that never stores anything, used when caching is turned off
+class NullCache:
+    hits = 0
+    misses = 0
+
+    def get(self, key):
+        self.misses += 1
+        return None
+
+    def set(self, key, value, ttl=None):
+        pass
+
+    def clear(self):
+        pass
+
+    def stats(self):
+        return {"hits": 0, "misses": self.misses, "entries": 0, "bytes": 0}
+
+
+_caches = {}
+_cache_lock = threading.Lock()
+
+
+# One cache per name per process, shared by every session. Each name is its
+# own sqlite file with its own byte budget: "extractions" for extracted text,
+# "llm_responses" for LLM replies.
+def get_cache(name="extractions"):
+    cache = _caches.get(name)
+    if cache is None:
+        with _cache_lock:
+            cache = _caches.get(name)
+            if cache is None:
+                if config.CACHE_DIR:
+                    max_bytes = (
+                        config.LLM_CACHE_MAX_BYTES
+                        if name == "llm_responses"
+                        else config.CACHE_MAX_BYTES
+                    )
+                    path = os.path.join(config.CACHE_DIR, f"{name}.sqlite3")
+                    try:
+                        cache = ExtractionCache(path, max_bytes)
+                    except (sqlite3.Error, OSError) as e:
+                        logger.warning("Cache %s unavailable, not caching: %s", path, e)
+                        cache = NullCache()
+                else:
+                    cache = NullCache()
+                _caches[name] = cache
+    return cache
+
+
+# Function to return the cached value for key, or compute, store and return it
+def cached(key, compute, ttl=None, cache=None):
+    if cache is None:
+        cache = get_cache()
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        if value is not None:
+            cache.set(key, value, ttl)
+    return value
@@ -0,0 +1,165 @@
+# Splits long text into LLM-sized chunks. Chunks are sized by estimated tokens
+# for the model rather than by characters, break on paragraph and then
+# sentence boundaries, and can overlap so context carries across a cut.
+import math
+import re
+
+from . import config
+from .errors import LLMError
+
+# Rough characters per token for English prose; close enough for budgeting
+# without pulling in a tokenizer
+CHARS_PER_TOKEN = 4
+
+# Tokens of text (excluding the prompt) each request carries, per model
+MODEL_CHUNK_TOKENS = {
+    "gemini-1.5-flash": 16_000,
+    "gemini-1.5-pro": 16_000,
+    "meta-llama/llama-3-8b-instruct:free": 6_000,
+}
+DEFAULT_CHUNK_TOKENS = 7_500  # the old 30,000 characters
+# Fewest tokens of text a chunk may carry next to its prompt; anything less
+# would split the text into slivers
+MIN_TEXT_TOKENS = 256
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+")
+
+
+# Function to estimate how many tokens a piece of text costs
+def estimate_tokens(text):
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+# Function to look up how many tokens of text a model should get per request
+def chunk_token_budget(model_name=None):
+    if config.LLM_CHUNK_TOKENS:
+        return config.LLM_CHUNK_TOKENS
+    return MODEL_CHUNK_TOKENS.get(model_name, DEFAULT_CHUNK_TOKENS)
+
+
+# Function to break text into the smallest pieces chunks are built from:
+# paragraphs, or sentences of paragraphs that are too long, or words of
+# sentences that are still too long
+def _pieces(text, max_tokens):
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if estimate_tokens(paragraph) <= max_tokens:
+            yield paragraph, "\n\n"
+            continue
+        for sentence in _SENTENCE_BREAK.split(paragraph):
+            if estimate_tokens(sentence) <= max_tokens:
+                yield sentence, " "
+                continue
+            words = sentence.split(" ")
+            max_chars = max_tokens * CHARS_PER_TOKEN
+            line = ""
+            for word in words:
+                while len(word) > max_chars:
+                    if line:
+                        yield line, " "
+                        line = ""
+                    yield word[:max_chars], ""
+                    word = word[max_chars:]
+                if line and len(line) + 1 + len(word) > max_chars:
+                    yield line, " "
+                    line = word
+                else:
+                    line = f"{line} {word}" if line else word
+            if line:
+                yield line, " "
+        # The last piece of a paragraph is followed by a paragraph break
+        yield "", "\n\n"
+
+
+# Function to split text into chunks of at most max_tokens estimated tokens.
+# Each chunk after the first starts with up to overlap_tokens of the end of
+# the previous one.
+def split_text(text, max_tokens=None, overlap_tokens=None, model_name=None):
+    if max_tokens is None:
+        max_tokens = chunk_token_budget(model_name)
+    if overlap_tokens is None:
+        overlap_tokens = config.LLM_CHUNK_OVERLAP_TOKENS
+    overlap_tokens = min(overlap_tokens, max_tokens // 2)
+
+    chunks = []
+    current = []  # (piece, separator) pairs
+    current_tokens = 0
+    for piece, separator in _pieces(text, max_tokens - overlap_tokens):
+        if not piece:
+            if current:
+                current[-1] = (current[-1][0], separator)
+            continue
+        piece_tokens = estimate_tokens(piece + separator)
+        if current and current_tokens + piece_tokens > max_tokens:
+            chunks.append(_join(current))
+            current = _tail(current, overlap_tokens)
+            current_tokens = sum(estimate_tokens(p + s) for p, s in current)
+        current.append((piece, separator))
+        current_tokens += piece_tokens
+    if current:
+        chunks.append(_join(current))
+    return chunks
+
+
+def _join(pieces):
+    return "".join(piece + separator for piece, separator in pieces).strip()
+
+
+# Function to take the trailing pieces of a chunk that fit in overlap_tokens.
+# A piece too long to carry whole contributes its last sentences, or its last
+# words, so the overlap isn't lost when the chunk ends in a long paragraph.
+def _tail(pieces, overlap_tokens):
+    tail = []
+    tokens = 0
+    for piece, separator in reversed(pieces):
+        piece_tokens = estimate_tokens(piece + separator)
+        if tokens + piece_tokens > overlap_tokens:
+            max_chars = (overlap_tokens - tokens) * CHARS_PER_TOKEN - len(separator)
+            end = _tail_text(piece, max_chars)
+            if end:
+                tail.insert(0, (end, separator))
+            break
+        tokens += piece_tokens
+        tail.insert(0, (piece, separator))
+    return tail
+
+
+# Function to take the end of text in at most max_chars characters: whole
+# sentences if the last one fits, otherwise the last words
+def _tail_text(text, max_chars):
+    sentences = _SENTENCE_BREAK.split(text)
+    end = _last_parts(sentences, max_chars)
+    if not end:
+        end = _last_parts(sentences[-1].split(" "), max_chars)
+    return end
+
+
+def _last_parts(parts, max_chars):
+    end = ""
+    for part in reversed(parts):
+        candidate = f"{part} {end}" if end else part
+        if len(candidate) > max_chars:
+            break
+        end = candidate
+    return end
+
+
+# Function to split text for a model and attach the same prompt to every
+# chunk. The prompt's own tokens come out of each chunk's budget; a prompt
+# that leaves less than MIN_TEXT_TOKENS for the text raises LLMError.
+def build_prompts(text, prompt, model_name=None, max_tokens=None, overlap_tokens=None):
+    if max_tokens is None:
+        max_tokens = chunk_token_budget(model_name)
+    text_tokens = max_tokens - estimate_tokens(prompt)
+    if text_tokens < MIN_TEXT_TOKENS:
+        raise LLMError(
+            f"The prompt is about {estimate_tokens(prompt)} tokens, too long for a"
+            f" {max_tokens} token chunk; raise COPYPASTA_LLM_CHUNK_TOKENS"
+        )
+    return [
+        f"{chunk}\n\n{prompt}"
+        for chunk in split_text(text, text_tokens, overlap_tokens)
+    ]
@@ -0,0 +1,329 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+
+from . import config
+from .bulk import _host
+from .errors import CopypastaError
+from .extract import IMAGE_EXTENSIONS, extract_source
+from .prompts import PROMPT_OPTIONS, run_prompt
+
+EXTRACTABLE_EXTENSIONS = (".pdf",) + IMAGE_EXTENSIONS
+
+
+# Function to tell what kind of source a URL or path is, for the output and
+# the summary
+def source_kind(source):
+    if source.startswith(("http://", "https://")):
+        return "youtube" if _host(source) == "youtube" else "web"
+    extension = os.path.splitext(source)[1].lower()
+    if extension == ".pdf":
+        return "pdf"
+    if extension in IMAGE_EXTENSIONS:
+        return "image"
+    return "other"
+
+
+# Function to read sources from a list file (or "-" for stdin), one URL or
+# path per line. Blank lines and lines starting with # are skipped.
+def read_source_list(path):
+    if path == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.startswith("#")]
+
+
+# Function to expand the command line into sources: URLs and files are kept,
+# directories are walked for PDFs and images. Duplicates are dropped, the
+# order is kept.
+def collect_sources(arguments, lists=()):
+    entries = list(arguments)
+    for path in lists:
+        entries.extend(read_source_list(path))
+
+    sources = []
+    for entry in entries:
+        if os.path.isdir(entry):
+            for root, dirs, files in os.walk(entry):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.lower().endswith(EXTRACTABLE_EXTENSIONS):
+                        sources.append(os.path.join(root, name))
+        else:
+            sources.append(entry)
+    return list(dict.fromkeys(sources))
+
+
+# Function to read the sources an earlier run already wrote to a JSONL output
+# without errors (and with every prompt asked for now), so a restarted run
+# skips them. A line cut off by a crash is ignored.
+def finished_sources(path, prompts=()):
+    finished = set()
+    if not os.path.exists(path):
+        return finished
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            replies = record.get("prompts") or {}
+            if record.get("error") is None and all(name in replies for name in prompts):
+                finished.add(record["source"])
+    return finished
+
+
+# Opens the output for appending, first ending a line cut off by a crash so
+# the next record starts on its own line
+def _open_output(path):
+    if os.path.exists(path) and os.path.getsize(path):
+        with open(path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            ended = f.read() == b"\n"
+        if not ended:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("\n")
+    return open(path, "a", encoding="utf-8")
+
+
+def _init_batch_worker():
+    from . import ocr
+
+    # Already one of several worker processes, so each one OCRs its own
+    # images and extracts PDFs serially
+    ocr.use_inline_ocr()
+    config.PDF_WORKERS = 1
+
+
+# Function to extract one source into a record; runs in the worker processes.
+# Any error, such as a corrupt file the PDF libraries choke on, is recorded
+# against the source instead of stopping the whole run.
+def _extract_record(source):
+    started = time.perf_counter()
+    try:
+        text, error = extract_source(source), None
+    except (CopypastaError, ValueError, OSError) as e:
+        text, error = None, str(e)
+    except Exception as e:
+        text, error = None, f"{type(e).__name__}: {e}"
+    return {
+        "source": source,
+        "kind": source_kind(source),
+        "text": text,
+        "error": error,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+# Function to run the named prompts over a record's text; runs on the main
+# process's threads so every source shares one LLM key pool
+def _prompt_record(record, prompts, backend):
+    started = time.perf_counter()
+    record["prompts"] = {}
+    for name in prompts:
+        try:
+            record["prompts"][name] = run_prompt(record["text"], name, backend)
+        except CopypastaError as e:
+            record["error"] = f"{name}: {e}"
+            break
+    record["seconds"] = round(record["seconds"] + time.perf_counter() - started, 3)
+    return record
+
+
+def _extraction_pool(workers):
+    if workers <= 1:
+        return ThreadPoolExecutor(max_workers=1)
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_batch_worker,
+    )
+
+
+# Generator yielding (index, record) for each source as it finishes: sources
+# are extracted on a pool of worker processes, then, when prompts are given,
+# the text is sent to the LLM on a thread pool while other sources extract
+def run_batch(sources, workers=None, prompts=(), backend=None):
+    if workers is None:
+        workers = config.BATCH_WORKERS
+    prompt_pool = ThreadPoolExecutor(max_workers=config.LLM_CONCURRENCY)
+    pool = _extraction_pool(workers)
+    try:
+        pending = {
+            pool.submit(_extract_record, source): (index, "extract")
+            for index, source in enumerate(sources)
+        }
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                index, stage = pending.pop(future)
+                record = future.result()
+                if stage == "extract" and prompts and record["error"] is None:
+                    future = prompt_pool.submit(_prompt_record, record, prompts, backend)
+                    pending[future] = (index, "prompt")
+                else:
+                    yield index, record
+    finally:
+        # Don't wait for queued sources when stopped early (e.g. Ctrl+C);
+        # a run with --output picks them up again next time
+        pool.shutdown(wait=False, cancel_futures=True)
+        prompt_pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Function to print the throughput of a run: sources and characters per
+# second overall and per kind of source
+def print_summary(records, skipped, seconds, file=None):
+    file = file or sys.stderr
+    by_kind = defaultdict(list)
+    for record in records:
+        by_kind[record["kind"]].append(record)
+    failed = sum(1 for record in records if record["error"] is not None)
+    characters = sum(len(record["text"] or "") for record in records)
+    rate = len(records) / seconds if seconds else 0.0
+    print(
+        f"{len(records)} sources in {seconds:.1f}s ({rate:.2f}/s, "
+        f"{characters / max(seconds, 1e-9):,.0f} chars/s): "
+        f"{len(records) - failed} ok, {failed} failed, {skipped} already done",
+        file=file,
+    )
+    for kind, kind_records in sorted(by_kind.items()):
+        kind_failed = sum(1 for record in kind_records if record["error"] is not None)
+        average = sum(record["seconds"] for record in kind_records) / len(kind_records)
+        print(
+            f"  {kind}: {len(kind_records)} ({kind_failed} failed), "
+            f"{average:.2f}s per source",
+            file=file,
+        )
+
+
+# Function to load .streamlit/secrets.toml (or another TOML file) for the
+# LLM backends. A missing file means no secrets, so a mock server set with
+# COPYPASTA_LLM_MOCK_URL still works.
+def load_secrets(path):
+    import tomllib
+
+    if not os.path.exists(path):
+        return {}
+    with open(path, "rb") as f:
+        return tomllib.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="copypasta",
+        description="Extract text from URLs, YouTube videos, PDFs and images.",
+    )
+    parser.add_argument(
+        "sources", nargs="*", help="URLs, file paths or directories of PDFs and images"
+    )
+    parser.add_argument(
+        "-l",
+        "--list",
+        action="append",
+        default=[],
+        dest="lists",
+        metavar="FILE",
+        help="file with one URL or path per line ('-' reads stdin)",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="write one JSON record per source to this JSONL file; sources "
+        "already written without errors are skipped when it is run again",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=config.BATCH_WORKERS,
+        help="worker processes (default %(default)s)",
+    )
+    parser.add_argument(
+        "-p",
+        "--prompt",
+        action="append",
+        default=[],
+        dest="prompts",
+        choices=list(PROMPT_OPTIONS),
+        metavar="NAME",
+        help="also run a Marketing Prompts prompt over each text, e.g. Summarize",
+    )
+    parser.add_argument(
+        "--secrets",
+        default=os.path.join(".streamlit", "secrets.toml"),
+        help="TOML file with the LLM keys (default %(default)s)",
+    )
+    parser.add_argument(
+        "-q", "--quiet", action="store_true", help="don't report each source"
+    )
+    args = parser.parse_args(argv)
+
+    sources = collect_sources(args.sources, args.lists)
+    if not sources:
+        parser.error("no sources given")
+
+    backend = None
+    if args.prompts:
+        from .llm import load_backend
+
+        try:
+            backend = load_backend(load_secrets(args.secrets))
+        except (CopypastaError, OSError, ValueError) as e:
+            parser.error(f"can't set up the LLM: {e}")
+
+    skipped = 0
+    out = None
+    if args.output:
+        finished = finished_sources(args.output, args.prompts)
+        skipped = sum(1 for source in sources if source in finished)
+        sources = [source for source in sources if source not in finished]
+        out = _open_output(args.output)
+
+    records = []
+    waiting = {}  # Records finished out of order, printed once their turn comes
+    next_index = 0
+    started = time.perf_counter()
+    try:
+        for index, record in run_batch(sources, args.workers, args.prompts, backend):
+            records.append(record)
+            if record["error"] is not None or not args.quiet:
+                status = record["error"] or f"{len(record['text'])} chars"
+                print(
+                    f"[{len(records)}/{len(sources)}] {record['source']}: {status}",
+                    file=sys.stderr,
+                )
+            if out is not None:
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+                continue
+            # Without --output, texts are printed in the order given
+            waiting[index] = record
+            while next_index in waiting:
+                record = waiting.pop(next_index)
+                if record["text"] is not None:
+                    print(record["text"])
+                for name, reply in (record.get("prompts") or {}).items():
+                    print(f"\n# {name}\n{reply}")
+                next_index += 1
+    finally:
+        if out is not None:
+            out.close()
+
+    print_summary(records, skipped, time.perf_counter() - started)
+    return 1 if any(record["error"] is not None for record in records) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+# Runtime settings for the extraction engine. Each one can be overridden with
+# an environment variable so Streamlit workers and the CLI share the same knobs.
+import os
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    if value is None or value == "":
+        return default
+    return int(value)
+
+
+# Number of worker processes that render PDF pages needing OCR in parallel.
+# The pool is started once and kept; the OCR itself still goes to the OCR
+# service. 0 or 1 renders pages serially in the calling process.
+PDF_WORKERS = _env_int("COPYPASTA_PDF_WORKERS", min(4, os.cpu_count() or 1))
+
+# PDFs with fewer pages needing OCR than this are always rendered serially,
+# since handing a few pages to the pool costs more than it saves. Pages with
+# a usable text layer never go to the pool.
+PDF_PARALLEL_MIN_PAGES = _env_int("COPYPASTA_PDF_PARALLEL_MIN_PAGES", 8)
+
+# Number of worker processes the command line uses to extract many sources at
+# once. Each worker handles one source at a time, OCRs inline and extracts
+# PDFs serially. 0 or 1 extracts in the calling process.
+BATCH_WORKERS = _env_int("COPYPASTA_BATCH_WORKERS", min(4, os.cpu_count() or 1))
+
+# Pixel budget a page is rendered at for OCR. The render DPI is picked per
+# page so that width * height lands near this many pixels (about 200 DPI on
+# A4), then clamped to the range below.
+OCR_PIXEL_BUDGET = _env_int("COPYPASTA_OCR_PIXEL_BUDGET", 4_000_000)
+OCR_MIN_DPI = _env_int("COPYPASTA_OCR_MIN_DPI", 72)
+OCR_MAX_DPI = _env_int("COPYPASTA_OCR_MAX_DPI", 300)
+
+
+# Options that change how PDF pages are OCR'd, part of every PDF cache key
+def ocr_options():
+    return {
+        "pixel_budget": OCR_PIXEL_BUDGET,
+        "min_dpi": OCR_MIN_DPI,
+        "max_dpi": OCR_MAX_DPI,
+        "preprocess": preprocess_options("pdf"),
+    }
+
+# Bump whenever a change alters extracted text, so cached results from older
+# code are not served
+EXTRACTOR_VERSION = "4"
+
+# Persistent extraction cache. Set COPYPASTA_CACHE_DIR to an empty string to
+# turn caching off.
+CACHE_DIR = os.environ.get(
+    "COPYPASTA_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "copypasta")
+)
+CACHE_MAX_BYTES = _env_int("COPYPASTA_CACHE_MAX_BYTES", 512 * 1024 * 1024)
+# Web pages change, so results fetched from a URL expire after this many seconds
+URL_CACHE_TTL = _env_int("COPYPASTA_URL_CACHE_TTL", 6 * 60 * 60)
+
+# Number of images EasyOCR runs detection and recognition on in one batch
+OCR_BATCH_SIZE = _env_int("COPYPASTA_OCR_BATCH_SIZE", 8)
+
+# When to load the OCR model in the background: "startup" as soon as the app
+# is imported, "on-demand" once a user picks the PDF or image input, "off" to
+# only load it when the first OCR call needs it
+OCR_WARMUP = os.environ.get("COPYPASTA_OCR_WARMUP", "on-demand")
+
+# OCR runs in this many dedicated worker processes, each holding the model
+# once, so it never blocks a Streamlit script thread. 0 runs OCR inline in
+# the calling thread as before.
+OCR_WORKERS = _env_int("COPYPASTA_OCR_WORKERS", 1)
+# Images waiting for the OCR workers before new submissions are refused, and
+# how many seconds a submission waits for room before giving up
+OCR_QUEUE_DEPTH = _env_int("COPYPASTA_OCR_QUEUE_DEPTH", 64)
+OCR_SUBMIT_TIMEOUT = _env_int("COPYPASTA_OCR_SUBMIT_TIMEOUT", 10)
+# Milliseconds a worker waits after picking up an image for others to join
+# its batch, and seconds an image may take before its caller gives up
+OCR_BATCH_WINDOW_MS = _env_int("COPYPASTA_OCR_BATCH_WINDOW_MS", 25)
+OCR_TIMEOUT = _env_int("COPYPASTA_OCR_TIMEOUT", 300)
+
+# How many LLM requests one "Send to LLM" run may have in flight at once, per
+# configured API key
+LLM_CONCURRENCY = _env_int("COPYPASTA_LLM_CONCURRENCY", 4)
+
+# Override the per-model chunk size (in estimated tokens) used when splitting
+# text for the LLM, and how many tokens consecutive chunks share
+LLM_CHUNK_TOKENS = _env_int("COPYPASTA_LLM_CHUNK_TOKENS", 0)
+LLM_CHUNK_OVERLAP_TOKENS = _env_int("COPYPASTA_LLM_CHUNK_OVERLAP_TOKENS", 0)
+
+# Most chunks a non-summary prompt is run over; longer text is cut off with
+# a warning. Summaries go through map-reduce and have no cap.
+LLM_MAX_CHUNKS = _env_int("COPYPASTA_LLM_MAX_CHUNKS", 10)
+
+# How many partial summaries are combined per reduce call
+SUMMARY_FAN_IN = _env_int("COPYPASTA_SUMMARY_FAN_IN", 4)
+
+# LLM replies are cached in their own store so long extractions don't evict
+# them. Replies expire after LLM_CACHE_TTL seconds.
+LLM_CACHE_MAX_BYTES = _env_int("COPYPASTA_LLM_CACHE_MAX_BYTES", 128 * 1024 * 1024)
+LLM_CACHE_TTL = _env_int("COPYPASTA_LLM_CACHE_TTL", 7 * 24 * 60 * 60)
+
+# Per-key limits the LLM key pool schedules against (requests and estimated
+# tokens per rolling minute), and how long a call may wait for a free key
+LLM_KEY_RPM = _env_int("COPYPASTA_LLM_KEY_RPM", 15)
+LLM_KEY_TPM = _env_int("COPYPASTA_LLM_KEY_TPM", 1_000_000)
+LLM_KEY_WAIT = _env_int("COPYPASTA_LLM_KEY_WAIT", 120)
+
+# Seconds an LLM request may take before it is abandoned
+LLM_TIMEOUT = _env_int("COPYPASTA_LLM_TIMEOUT", 120)
+
+# How the LLM router picks between configured backends: "latency" (lowest
+# average time to answer), "throughput" (most characters per second) or
+# "ordered" (first healthy backend in configuration order)
+LLM_ROUTING = os.environ.get("COPYPASTA_LLM_ROUTING", "latency")
+# Set to a mock server URL (see copypasta.mock_llm) to add it as a backend
+LLM_MOCK_URL = os.environ.get("COPYPASTA_LLM_MOCK_URL", "")
+
+# Seconds to wait for a website to accept the connection, between bytes of
+# its reply, and for the whole download. The total deadline stops a site that
+# trickles bytes from holding a Streamlit worker forever.
+HTTP_CONNECT_TIMEOUT = _env_int("COPYPASTA_HTTP_CONNECT_TIMEOUT", 10)
+HTTP_READ_TIMEOUT = _env_int("COPYPASTA_HTTP_READ_TIMEOUT", 30)
+HTTP_TOTAL_TIMEOUT = _env_int("COPYPASTA_HTTP_TOTAL_TIMEOUT", 120)
+
+# Largest download accepted from a URL
+HTTP_MAX_BYTES = _env_int("COPYPASTA_HTTP_MAX_BYTES", 200 * 1024 * 1024)
+
+USER_AGENT = os.environ.get(
+    "COPYPASTA_USER_AGENT",
+    "Mozilla/5.0 (compatible; copypasta/1.0; +https://github.com/0xdatawolf001/copypasta)",
+)
+
+# URLs fetched at once by bulk extraction, and at most this many per host so
+# a list of links to one site doesn't hammer it
+URL_CONCURRENCY = _env_int("COPYPASTA_URL_CONCURRENCY", 16)
+URL_PER_HOST = _env_int("COPYPASTA_URL_PER_HOST", 4)
+
+# How web pages are turned into text: "main" keeps the article body and drops
+# navigation, footers and other boilerplate (trafilatura, falling back to
+# BeautifulSoup), "full" keeps every piece of text on the page
+HTML_MODE = os.environ.get("COPYPASTA_HTML_MODE", "main")
+
+# HTML pages declaring more bytes than this are parsed incrementally as they
+# download instead of being read whole, and stop once HTML_MAX_CHARS
+# characters of text have been collected (0 turns either limit off)
+HTML_STREAM_BYTES = _env_int("COPYPASTA_HTML_STREAM_BYTES", 2 * 1024 * 1024)
+HTML_MAX_CHARS = _env_int("COPYPASTA_HTML_MAX_CHARS", 500_000)
+
+# Transcript languages to ask YouTube for, in order of preference
+YOUTUBE_LANGUAGES = [
+    language.strip()
+    for language in os.environ.get("COPYPASTA_YOUTUBE_LANGUAGES", "en").split(",")
+    if language.strip()
+]
+# Transcripts fetched at once for playlists and channels, and the most videos
+# taken from one of them
+YOUTUBE_CONCURRENCY = _env_int("COPYPASTA_YOUTUBE_CONCURRENCY", 4)
+YOUTUBE_MAX_VIDEOS = _env_int("COPYPASTA_YOUTUBE_MAX_VIDEOS", 50)
+# Split transcripts into "[mm:ss]" sections of this many seconds (0 = one
+# block of text)
+YOUTUBE_SLICE_SECONDS = _env_int("COPYPASTA_YOUTUBE_SLICE_SECONDS", 0)
+
+
+# Cleanup applied to images before OCR, by name. grayscale drops the colour
+# channels, crop trims uniform borders, deskew straightens text tilted up to
+# that many degrees, contrast stretches the darkest and lightest 1% to black
+# and white, and text_height shrinks the image so a line of text is about that
+# many pixels tall (never by more than max_scale; smaller text is only
+# enlarged with upscale). "off" leaves images as decoded.
+PREPROCESS_PROFILES = {
+    "off": {},
+    "screenshot": {"grayscale": True, "crop": True, "contrast": True},
+    "scan": {"grayscale": True, "crop": True, "deskew": 5, "contrast": True},
+    "photo": {
+        "grayscale": True,
+        "crop": True,
+        "deskew": 10,
+        "contrast": True,
+        "text_height": 24,
+        "max_scale": 2.0,
+    },
+}
+
+# Profile used for each source of images: uploaded images and images behind
+# URLs ("image") and PDF pages rendered for OCR ("pdf")
+PREPROCESS = {
+    "image": os.environ.get("COPYPASTA_PREPROCESS_IMAGE", "photo"),
+    "pdf": os.environ.get("COPYPASTA_PREPROCESS_PDF", "scan"),
+}
+
+
+# Preprocessing options for a source, part of every OCR cache key
+def preprocess_options(source):
+    return PREPROCESS_PROFILES[PREPROCESS.get(source, "off")]
+
+
+# Background jobs for long extractions and LLM runs: how many run at once,
+# how long a finished job's result is kept for the sessions waiting on it,
+# and how often the pages check on a running job (seconds)
+JOB_WORKERS = _env_int("COPYPASTA_JOB_WORKERS", 4)
+JOB_RETENTION_SECONDS = _env_int("COPYPASTA_JOB_RETENTION_SECONDS", 60 * 60)
+JOB_POLL_SECONDS = _env_int("COPYPASTA_JOB_POLL_SECONDS", 1)
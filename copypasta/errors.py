@@ -0,0 +1,18 @@
+# Errors raised by the extraction engine. The Streamlit pages catch these and
+# show them with st.error, the CLI prints them.
+
+
+class CopypastaError(Exception):
+    pass
+
+
+class ExtractionError(CopypastaError):
+    pass
+
+
+class LLMError(CopypastaError):
+    pass
+
+
+class JobCancelled(CopypastaError):
+    pass
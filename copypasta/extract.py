@@ -0,0 +1,171 @@
+# Entry points used by the Streamlit pages and the CLI. Each one checks the
+# persistent cache before running the extractor, so the same PDF, image or URL
+# is only processed once per extractor version and set of options.
+import json
+import os
+import time
+
+from . import config
+from .cache import cached, content_hash, get_cache, make_key
+from .ocr import decode_image, extract_text_from_image, iter_text_from_arrays
+from .pdf import iter_pdf_pages
+from .fetch import fetch
+from .web import extract_text_from_response
+from .youtube import (
+    extract_video_id,
+    extract_youtube_collection,
+    extract_youtube_transcript,
+    is_video_collection,
+)
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+
+def _pdf_key(pdf_bytes, start_page, end_page):
+    return make_key(
+        "pdf",
+        content_hash(pdf_bytes),
+        start=start_page,
+        end=end_page,
+        **config.ocr_options(),
+    )
+
+
+# Function to extract text from PDF bytes for 1-based inclusive pages
+def extract_pdf(pdf_bytes, start_page=1, end_page=float("inf"), progress_callback=None):
+    return "".join(iter_pdf(pdf_bytes, start_page, end_page, progress_callback))
+
+
+def _image_key(image_bytes):
+    return make_key(
+        "image", content_hash(image_bytes), **config.preprocess_options("image")
+    )
+
+
+# Function to extract text from image bytes
+def extract_image(image_bytes):
+    return cached(_image_key(image_bytes), lambda: extract_text_from_image(image_bytes))
+
+
+# Function to extract text from many images, one string per image in input
+# order. progress_callback(done, total, index) is called per image.
+def extract_images(image_bytes_list, progress_callback=None):
+    texts = [None] * len(image_bytes_list)
+    for done, (index, text) in enumerate(iter_images(image_bytes_list), 1):
+        texts[index] = text
+        if progress_callback:
+            progress_callback(done, len(image_bytes_list), index)
+    return texts
+
+
+# Generator yielding (index, text) per image in input order. Cached images are
+# served from the cache and the rest are OCR'd in batches; each result is
+# released once every image before it is done.
+def iter_images(image_bytes_list):
+    cache = get_cache()
+    keys = [_image_key(data) for data in image_bytes_list]
+    results = {}
+    pending = []
+    for index, key in enumerate(keys):
+        text = cache.get(key)
+        if text is None:
+            pending.append(index)
+        else:
+            results[index] = text
+
+    ocr_results = iter_text_from_arrays(
+        [decode_image(image_bytes_list[index]) for index in pending]
+    )
+    position = 0
+    while position < len(image_bytes_list):
+        while position in results:
+            yield position, results.pop(position)
+            position += 1
+        if position == len(image_bytes_list):
+            return
+        pending_index, text = next(ocr_results)
+        cache.set(keys[pending[pending_index]], text)
+        results[pending[pending_index]] = text
+
+
+# Generator yielding the text of a PDF in pieces as pages finish. Joined with
+# "".join the pieces equal extract_pdf's result. A whole-document cache hit
+# comes back as a single piece; otherwise the full text is cached once the
+# generator runs to the end.
+def iter_pdf(pdf_bytes, start_page=1, end_page=float("inf"), progress_callback=None):
+    key = _pdf_key(pdf_bytes, start_page, end_page)
+    text = get_cache().get(key)
+    if text is not None:
+        yield text
+        return
+
+    pieces = []
+    for _, page_text in iter_pdf_pages(
+        pdf_bytes, start_page, end_page, progress_callback=progress_callback
+    ):
+        if page_text:
+            pieces.append(page_text + "\n")
+            yield pieces[-1]
+    get_cache().set(key, "".join(pieces))
+
+
+# Function to extract text from a URL, using the transcripts for YouTube links
+def extract_url(url, progress_callback=None):
+    # Check if it's a YouTube playlist, channel or video link
+    if is_video_collection(url):
+        return extract_youtube_collection(url, progress_callback)
+    video_id = extract_video_id(url)
+    if video_id:
+        return extract_youtube_transcript(video_id)
+
+    # Within URL_CACHE_TTL the cached text is used as is. After that the page
+    # is requested again with its ETag / Last-Modified, and a 304 keeps the
+    # cached text without downloading or extracting anything.
+    cache = get_cache()
+    key = make_key(
+        "url_entry",
+        url,
+        html_mode=config.HTML_MODE,
+        html_stream_bytes=config.HTML_STREAM_BYTES,
+        html_max_chars=config.HTML_MAX_CHARS,
+        **config.ocr_options(),
+    )
+    entry = cache.get(key)
+    entry = json.loads(entry) if entry else {}
+    if entry and time.time() - entry["fetched"] < config.URL_CACHE_TTL:
+        return entry["text"]
+
+    with fetch(url, entry.get("etag"), entry.get("last_modified")) as result:
+        if result.not_modified and entry:
+            text = entry["text"]
+        else:
+            text = extract_text_from_response(result, progress_callback)
+        etag, last_modified = result.etag, result.last_modified
+
+    if text is not None:
+        # Without validators the entry can't be revalidated, so it just
+        # expires; with them it stays until evicted
+        revalidate = bool(etag or last_modified)
+        entry = {
+            "text": text,
+            "fetched": time.time(),
+            "etag": etag or entry.get("etag"),
+            "last_modified": last_modified or entry.get("last_modified"),
+        }
+        cache.set(key, json.dumps(entry), None if revalidate else config.URL_CACHE_TTL)
+    return text
+
+
+# Function to route a URL or a local file to the right extractor
+def extract_source(source, progress_callback=None):
+    if source.startswith(("http://", "https://")):
+        return extract_url(source, progress_callback)
+
+    extension = os.path.splitext(source)[1].lower()
+    if extension == ".pdf":
+        with open(source, "rb") as f:
+            return extract_pdf(f.read(), progress_callback=progress_callback)
+    if extension in IMAGE_EXTENSIONS:
+        with open(source, "rb") as f:
+            return extract_image(f.read())
+    raise ValueError(f"Don't know how to extract text from {source}")
@@ -0,0 +1,212 @@
+# Shared HTTP layer for URL extraction. One keep-alive session per process
+# with compression and a User-Agent, connect/read timeouts plus a deadline for
+# the whole download, a size cap, saving of big files (PDFs) to disk, and
+# conditional requests so unchanged pages aren't downloaded again.
+import importlib.util
+import os
+import re
+import tempfile
+import threading
+import time
+
+import requests
+
+from . import config
+from .errors import ExtractionError
+
+CHUNK_BYTES = 64 * 1024
+
+_session = None
+_session_lock = threading.Lock()
+
+
+# urllib3 only decodes brotli when one of these packages is installed
+def _accept_encoding():
+    if importlib.util.find_spec("brotli") or importlib.util.find_spec("brotlicffi"):
+        return "gzip, deflate, br"
+    return "gzip, deflate"
+
+
+# One requests.Session per process so URL fetches reuse connections
+def get_session():
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(
+                    pool_connections=16, pool_maxsize=16
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update(
+                    {
+                        "User-Agent": config.USER_AGENT,
+                        "Accept-Encoding": _accept_encoding(),
+                    }
+                )
+                _session = session
+    return _session
+
+
+# Generator over the decoded body. urllib3's read1 returns whatever has
+# arrived instead of waiting for a full chunk, so the deadline is checked even
+# when a server sends a few bytes at a time.
+def _iter_body(response):
+    read = getattr(response.raw, "read1", None)
+    if read is None:
+        yield from response.iter_content(CHUNK_BYTES)
+        return
+    while True:
+        chunk = read(CHUNK_BYTES, decode_content=True)
+        if not chunk:
+            return
+        yield chunk
+
+
+# A response whose headers have arrived. The body is downloaded on demand:
+# read() returns all of it, save() writes it to a temporary file and returns
+# the path, and iter_chunks() hands it over piece by piece for callers that
+# can work on a stream. All of them enforce the size cap and deadline.
+class FetchResult:
+    def __init__(self, url, response, max_bytes, deadline):
+        self.url = response.url
+        self.status = response.status_code
+        self.headers = response.headers
+        self.size = 0
+        self._requested_url = url
+        self._response = response
+        self._max_bytes = max_bytes
+        self._deadline = deadline
+        self._path = None
+
+    @property
+    def not_modified(self):
+        return self.status == 304
+
+    @property
+    def mime_type(self):
+        content_type = self.headers.get("Content-Type", "")
+        return content_type.split(";")[0].strip().lower()
+
+    # Character set named in Content-Type, or None
+    @property
+    def charset(self):
+        content_type = self.headers.get("Content-Type", "")
+        match = re.search(r"charset=[\"']?([\w.:-]+)", content_type)
+        return match.group(1) if match else None
+
+    # Size the server says the body has, or None when it doesn't say
+    @property
+    def content_length(self):
+        length = self.headers.get("Content-Length")
+        return int(length) if length and length.isdigit() else None
+
+    @property
+    def etag(self):
+        return self.headers.get("ETag")
+
+    @property
+    def last_modified(self):
+        return self.headers.get("Last-Modified")
+
+    def iter_chunks(self):
+        if self.not_modified:
+            return
+        url = self._requested_url
+        try:
+            for chunk in _iter_body(self._response):
+                self.size += len(chunk)
+                if self.size > self._max_bytes:
+                    raise ExtractionError(
+                        f"{url} is over the {self._max_bytes} byte limit"
+                    )
+                if time.monotonic() > self._deadline:
+                    raise ExtractionError(
+                        f"{url} took over {config.HTTP_TOTAL_TIMEOUT}s to download"
+                    )
+                yield chunk
+        except requests.RequestException as e:
+            raise ExtractionError(f"Error fetching {url}: {e}") from e
+
+    def read(self):
+        if self._path is not None:
+            with open(self._path, "rb") as f:
+                return f.read()
+        return b"".join(self.iter_chunks())
+
+    # Function to download the body into a temporary file and return its path,
+    # so big files are opened from disk rather than held in memory. The file
+    # is removed when the result is closed.
+    def save(self, suffix=None):
+        if self._path is None:
+            f = tempfile.NamedTemporaryFile(
+                prefix="copypasta-", suffix=suffix, delete=False
+            )
+            try:
+                with f:
+                    for chunk in self.iter_chunks():
+                        f.write(chunk)
+            except BaseException:
+                os.remove(f.name)
+                raise
+            self._path = f.name
+        return self._path
+
+    def close(self):
+        self._response.close()
+        if self._path is not None:
+            try:
+                os.remove(self._path)
+            except OSError:
+                pass
+            self._path = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# Function to request url and return a FetchResult once the headers are in;
+# use it as a context manager so the connection goes back to the pool. With
+# etag or last_modified from an earlier fetch the request is conditional, and
+# an unchanged page comes back as a 304 with no body. Bodies over max_bytes,
+# downloads past the total deadline and HTTP errors raise ExtractionError.
+def fetch(url, etag=None, last_modified=None, max_bytes=None):
+    if max_bytes is None:
+        max_bytes = config.HTTP_MAX_BYTES
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
+    deadline = time.monotonic() + config.HTTP_TOTAL_TIMEOUT
+    try:
+        response = get_session().get(
+            url,
+            headers=headers,
+            stream=True,
+            timeout=(config.HTTP_CONNECT_TIMEOUT, config.HTTP_READ_TIMEOUT),
+        )
+    except requests.RequestException as e:
+        raise ExtractionError(f"Error fetching {url}: {e}") from e
+
+    result = FetchResult(url, response, max_bytes, deadline)
+    try:
+        if not result.not_modified:
+            response.raise_for_status()
+        if (result.content_length or 0) > max_bytes:
+            raise ExtractionError(
+                f"{url} is {result.content_length} bytes,"
+                f" over the {max_bytes} byte limit"
+            )
+    except requests.RequestException as e:
+        result.close()
+        raise ExtractionError(f"Error fetching {url}: {e}") from e
+    except BaseException:
+        result.close()
+        raise
+    return result
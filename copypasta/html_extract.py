@@ -0,0 +1,205 @@
+# Text extraction from HTML. The main-content path runs trafilatura on an lxml
+# tree, which keeps the article and drops menus, footers and sidebars. When
+# trafilatura isn't installed or finds no main content, BeautifulSoup strips
+# the usual boilerplate elements and keeps the rest. Huge pages skip both and
+# go through an event-based parser fed straight from the download, which
+# never builds a tree and stops at a character budget.
+import codecs
+import logging
+import re
+from html.parser import HTMLParser
+
+from . import config
+
+logger = logging.getLogger(__name__)
+
+# Elements whose text is never part of the content
+BOILERPLATE_TAGS = [
+    "script",
+    "style",
+    "noscript",
+    "template",
+    "nav",
+    "header",
+    "footer",
+    "aside",
+    # Not "form": ASP.NET and many CMS pages wrap the whole body in one, so
+    # only the drop-down lists inside forms are dropped
+    "select",
+    "iframe",
+    "svg",
+    "title",
+]
+
+# Elements that end a block of text in the incremental parser
+BLOCK_TAGS = {
+    "address", "article", "blockquote", "br", "dd", "div", "dl", "dt",
+    "figcaption", "h1", "h2", "h3", "h4", "h5", "h6", "hr", "li", "main",
+    "ol", "p", "pre", "section", "table", "td", "th", "tr", "ul",
+}
+# Elements never closed, so they can't open a skipped region
+VOID_TAGS = {"br", "hr", "img", "input", "link", "meta", "source", "wbr"}
+# A block longer than this is emitted in pieces, so text without any tags
+# can't grow the buffer past it
+MAX_BLOCK_CHARS = 64 * 1024
+
+_trafilatura = None
+
+
+# trafilatura is optional, and some lxml releases break its import, so any
+# ImportError just turns the fast path off
+def _load_trafilatura():
+    global _trafilatura
+    if _trafilatura is None:
+        try:
+            import trafilatura
+
+            _trafilatura = trafilatura
+        except ImportError as e:
+            logger.info("trafilatura unavailable, using BeautifulSoup: %s", e)
+            _trafilatura = False
+    return _trafilatura
+
+
+# Function to collapse runs of spaces inside each line and drop empty lines
+def clean_text(text):
+    lines = (re.sub(r"\s+", " ", line).strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+# Function to extract the main content of a page with trafilatura, or None
+# when it isn't available or finds nothing
+def trafilatura_text(html, url=None):
+    trafilatura = _load_trafilatura()
+    if not trafilatura:
+        return None
+    text = trafilatura.extract(
+        html,
+        url=url,
+        include_comments=False,
+        include_tables=True,
+        favor_recall=True,
+    )
+    return clean_text(text) if text else None
+
+
+# Function to extract page text with BeautifulSoup. With main_only the
+# boilerplate elements are removed first.
+def soup_text(html, main_only=True):
+    from bs4 import BeautifulSoup, FeatureNotFound
+
+    try:
+        soup = BeautifulSoup(html, "lxml")
+    except FeatureNotFound:
+        soup = BeautifulSoup(html, "html.parser")
+
+    if main_only:
+        for element in soup.find_all(BOILERPLATE_TAGS):
+            element.decompose()
+
+    # Find collapsed sections (often using CSS class "mw-collapsed")
+    for collapsed_section in soup.find_all(class_="mw-collapsed"):
+        # Remove the "collapsed" class to expand the section
+        collapsed_section["class"] = [
+            cls for cls in collapsed_section["class"] if cls != "mw-collapsed"
+        ]
+
+    root = (soup.find("main") or soup.find("article") or soup) if main_only else soup
+    return clean_text(root.get_text(separator="\n"))
+
+
+# Function to extract text from HTML (bytes or str) according to mode,
+# config.HTML_MODE by default, keeping at most max_chars characters
+# (config.HTML_MAX_CHARS by default, 0 for no limit)
+def extract_html_text(html, url=None, mode=None, max_chars=None):
+    if max_chars is None:
+        max_chars = config.HTML_MAX_CHARS
+    mode = mode or config.HTML_MODE
+    text = trafilatura_text(html, url) if mode == "main" else None
+    if not text:
+        text = soup_text(html, main_only=mode == "main")
+    return text[:max_chars] if max_chars else text
+
+
+# Event-based parser that turns HTML into cleaned blocks of text as it is fed.
+# Text inside skipped elements is dropped; everything else is gathered until
+# the next block boundary.
+class _BlockParser(HTMLParser):
+    def __init__(self, main_only=True):
+        super().__init__(convert_charrefs=True)
+        self.skip_tags = set(BOILERPLATE_TAGS) if main_only else {
+            "script", "style", "noscript", "template",
+        }
+        self.skipping = []  # open skipped elements, innermost last
+        self.parts = []
+        self.part_chars = 0
+        self.blocks = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.skip_tags and tag not in VOID_TAGS:
+            self.skipping.append(tag)
+        elif tag in BLOCK_TAGS:
+            self.flush()
+
+    def handle_endtag(self, tag):
+        if tag in self.skipping:
+            # Close it and anything left open inside it
+            while self.skipping.pop() != tag:
+                pass
+        elif tag in BLOCK_TAGS:
+            self.flush()
+
+    def handle_data(self, data):
+        if self.skipping:
+            return
+        self.parts.append(data)
+        self.part_chars += len(data)
+        if self.part_chars > MAX_BLOCK_CHARS:
+            self.flush()
+
+    def flush(self):
+        text = re.sub(r"\s+", " ", "".join(self.parts)).strip()
+        self.parts = []
+        self.part_chars = 0
+        if text:
+            self.blocks.append(text)
+
+    def take_blocks(self):
+        blocks, self.blocks = self.blocks, []
+        return blocks
+
+
+# Generator yielding blocks of text from HTML that arrives as an iterable of
+# byte chunks, decoded incrementally with encoding (UTF-8 if unknown)
+def iter_html_blocks(chunks, encoding=None, main_only=True):
+    try:
+        decoder = codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+    except LookupError:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    parser = _BlockParser(main_only)
+    for chunk in chunks:
+        parser.feed(decoder.decode(chunk))
+        yield from parser.take_blocks()
+    parser.feed(decoder.decode(b"", final=True))
+    parser.close()
+    parser.flush()
+    yield from parser.take_blocks()
+
+
+# Function to extract text from streamed HTML, one line per block, stopping
+# as soon as max_chars characters have been collected (config.HTML_MAX_CHARS
+# by default, 0 for no limit). Whatever is left of the stream is not read.
+def stream_html_text(chunks, encoding=None, max_chars=None, mode=None):
+    if max_chars is None:
+        max_chars = config.HTML_MAX_CHARS
+    main_only = (mode or config.HTML_MODE) != "full"
+    blocks = []
+    used = 0
+    for block in iter_html_blocks(chunks, encoding, main_only):
+        if max_chars and used + len(block) >= max_chars:
+            if max_chars > used:
+                blocks.append(block[: max_chars - used])
+            break
+        blocks.append(block)
+        used += len(block) + 1
+    return "\n".join(blocks)
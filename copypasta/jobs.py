@@ -0,0 +1,202 @@
+# Background jobs for long runs (PDF and image extraction, LLM prompts). A job
+# runs on a thread owned by the process, not by a Streamlit script run, so it
+# keeps going when a widget click reruns the page; the page only stores the
+# job id and reads the job's progress and text on every run. Jobs are keyed
+# by a hash of their input: submitting a key that is already queued, running
+# or recently finished returns the existing job, so sessions uploading the
+# same file share one computation. A job is only cancelled once every session
+# that submitted it has let go of it.
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import config
+from .errors import CopypastaError, JobCancelled
+
+logger = logging.getLogger(__name__)
+
+_manager = None
+_manager_lock = threading.Lock()
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class Job:
+    def __init__(self, job_id, key, kind):
+        self.id = job_id
+        self.key = key
+        self.kind = kind
+        self.status = QUEUED
+        self.done = 0
+        self.total = 0
+        self.step = None
+        self.parts = []
+        self.result = None
+        self.error = None
+        self.owners = set()
+        self.created = time.time()
+        self.finished_at = None
+        self._cancel = threading.Event()
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED, CANCELLED)
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    # Text produced so far, or the result once the job is done
+    @property
+    def text(self):
+        if self.result is not None:
+            return self.result
+        return "".join(list(self.parts))
+
+    # Raises JobCancelled once the job is cancelled. The callbacks below call
+    # it, so work handed a job callback stops at its next report.
+    def check(self):
+        if self._cancel.is_set():
+            raise JobCancelled("The job was cancelled")
+
+    # progress_callback(done, total, index) for the engine functions
+    def report(self, done, total, index=None):
+        self.check()
+        self.done, self.total = done, total
+
+    # Progress for work with several steps, such as map then reduce
+    def report_step(self, step, done, total):
+        self.check()
+        self.step = step
+        self.done, self.total = done, total
+
+    def append(self, piece):
+        self.check()
+        self.parts.append(piece)
+
+    # Function to append every piece of a generator and return the joined text
+    def collect(self, pieces):
+        try:
+            for piece in pieces:
+                self.append(piece)
+        finally:
+            pieces.close()
+        return "".join(self.parts)
+
+    def as_dict(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "done": self.done,
+            "total": self.total,
+            "sessions": len(self.owners),
+            "error": self.error,
+        }
+
+
+class JobManager:
+    def __init__(self, workers=None, retention_seconds=None):
+        self.retention_seconds = (
+            config.JOB_RETENTION_SECONDS
+            if retention_seconds is None
+            else retention_seconds
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers or config.JOB_WORKERS,
+            thread_name_prefix="copypasta-job",
+        )
+        self._jobs = {}
+        self._by_key = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    # Function to start work(job) in the background for owner (any hashable id
+    # of the session), or join the job already running for the same key.
+    # work returns the job's text and should pass the job's callbacks to the
+    # engine so progress is shown and cancellation is noticed.
+    def submit(self, key, work, owner=None, kind="job"):
+        with self._lock:
+            self._prune()
+            job = self._by_key.get(key)
+            if job is None or job.status in (FAILED, CANCELLED):
+                job = Job(f"{kind}-{next(self._ids)}", key, kind)
+                self._jobs[job.id] = job
+                self._by_key[key] = job
+                self._executor.submit(self._run, job, work)
+            job.owners.add(owner)
+        return job
+
+    def _run(self, job, work):
+        if job.cancelled:
+            self._finish(job, CANCELLED)
+            return
+        job.status = RUNNING
+        try:
+            job.result = work(job)
+        except JobCancelled:
+            self._finish(job, CANCELLED)
+        except Exception as e:
+            if not isinstance(e, CopypastaError):
+                logger.exception("Job %s failed", job.id)
+            job.error = str(e)
+            self._finish(job, FAILED)
+        else:
+            self._finish(job, DONE)
+
+    def _finish(self, job, status):
+        with self._lock:
+            job.status = status
+            job.finished_at = time.time()
+            # Only finished results are shared with later submissions
+            if status != DONE and self._by_key.get(job.key) is job:
+                del self._by_key[job.key]
+
+    # Drops finished jobs older than retention_seconds. Called with the lock
+    # held.
+    def _prune(self):
+        cutoff = time.time() - self.retention_seconds
+        for job_id, job in list(self._jobs.items()):
+            if job.finished and job.finished_at < cutoff:
+                del self._jobs[job_id]
+                if self._by_key.get(job.key) is job:
+                    del self._by_key[job.key]
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    # Function to let go of a job for owner, cancelling it once no session is
+    # waiting on it any more. Returns the job, or None if it is gone.
+    def cancel(self, job_id, owner=None):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            job.owners.discard(owner)
+            if not job.owners and not job.finished:
+                job._cancel.set()
+                # A new submission of the same input starts afresh
+                if self._by_key.get(job.key) is job:
+                    del self._by_key[job.key]
+        return job
+
+    def jobs(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+
+# One manager per process, shared by every session
+def get_job_manager():
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = JobManager()
+    return _manager
@@ -0,0 +1,167 @@
+# Shares a set of LLM API keys between every session in the process. Each
+# request goes to the least-loaded key that is under its per-minute request
+# and token limits and not cooling down after a rate limit; when none is
+# available the caller waits for the first one to free up.
+import random
+import threading
+import time
+from collections import deque
+
+from . import config
+from .errors import LLMError
+
+WINDOW = 60.0  # seconds the per-minute limits are measured over
+BACKOFF_BASE = 2.0  # first cool-down after a 429, doubled on each one after
+BACKOFF_MAX = 120.0
+FAILURES_BEFORE_COOLDOWN = 3  # non-429 errors in a row before a key rests
+
+
+class _KeyState:
+    def __init__(self, index, key):
+        self.index = index
+        self.key = key
+        self.window = deque()  # (timestamp, tokens) of requests in the window
+        self.window_tokens = 0
+        self.in_flight = 0
+        self.cooldown_until = 0.0
+        self.rate_limits = 0  # 429s in a row
+        self.failures = 0  # other errors in a row
+        self.total_requests = 0
+        self.total_rate_limits = 0
+        self.total_failures = 0
+
+    def trim(self, now):
+        while self.window and self.window[0][0] <= now - WINDOW:
+            self.window_tokens -= self.window.popleft()[1]
+
+    # Seconds until this key can take a request of this many tokens, 0 if now
+    def wait_time(self, now, tokens, rpm, tpm):
+        waits = [self.cooldown_until - now]
+        if len(self.window) >= rpm:
+            waits.append(self.window[len(self.window) - rpm][0] + WINDOW - now)
+        if self.window and self.window_tokens + tokens > tpm:
+            # Wait for enough old requests to leave the window
+            freed = 0
+            for timestamp, request_tokens in self.window:
+                freed += request_tokens
+                if self.window_tokens - freed + tokens <= tpm:
+                    waits.append(timestamp + WINDOW - now)
+                    break
+            else:
+                # Bigger than the whole budget: run it alone once the window
+                # is empty
+                waits.append(self.window[-1][0] + WINDOW - now)
+        return max(0.0, *waits)
+
+
+class KeyPool:
+    def __init__(self, keys, rpm=None, tpm=None):
+        if not keys:
+            raise LLMError("No LLM keys configured")
+        self.rpm = rpm or config.LLM_KEY_RPM
+        self.tpm = tpm or config.LLM_KEY_TPM
+        self._keys = [_KeyState(index, key) for index, key in enumerate(keys)]
+        self._condition = threading.Condition()
+
+    # Function to reserve the least-loaded available key for a request of
+    # tokens estimated tokens. Blocks up to timeout seconds for one to free up.
+    def acquire(self, tokens=0, timeout=None):
+        if timeout is None:
+            timeout = config.LLM_KEY_WAIT
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                waits = []
+                for state in self._keys:
+                    state.trim(now)
+                    waits.append(state.wait_time(now, tokens, self.rpm, self.tpm))
+
+                ready = [state for state, wait in zip(self._keys, waits) if wait == 0]
+                if ready:
+                    state = min(
+                        ready,
+                        key=lambda s: (s.in_flight, len(s.window), s.window_tokens),
+                    )
+                    state.window.append((now, tokens))
+                    state.window_tokens += tokens
+                    state.in_flight += 1
+                    state.total_requests += 1
+                    return state
+
+                remaining = deadline - now
+                if remaining <= 0:
+                    raise LLMError("LLM limit reached! Come back another day")
+                self._condition.wait(min(remaining, min(waits)))
+
+    # Function to hand a key back after a successful request
+    def release(self, state):
+        with self._condition:
+            state.in_flight -= 1
+            state.rate_limits = 0
+            state.failures = 0
+            self._condition.notify_all()
+
+    # Function to hand a key back after a 429. The key cools down for an
+    # exponentially growing, jittered interval.
+    def release_rate_limited(self, state):
+        with self._condition:
+            state.in_flight -= 1
+            state.rate_limits += 1
+            state.total_rate_limits += 1
+            backoff = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (state.rate_limits - 1))
+            state.cooldown_until = time.monotonic() + backoff * random.uniform(0.5, 1.5)
+            self._condition.notify_all()
+
+    # Function to hand a key back after any other error. A key that keeps
+    # failing rests like a rate-limited one.
+    def release_failed(self, state):
+        with self._condition:
+            state.in_flight -= 1
+            state.failures += 1
+            state.total_failures += 1
+            if state.failures >= FAILURES_BEFORE_COOLDOWN:
+                state.cooldown_until = time.monotonic() + BACKOFF_MAX * random.uniform(
+                    0.5, 1.0
+                )
+            self._condition.notify_all()
+
+    # Function to report per-key utilization. Keys are identified by their
+    # index, never by the key itself.
+    def metrics(self):
+        with self._condition:
+            now = time.monotonic()
+            rows = []
+            for state in self._keys:
+                state.trim(now)
+                rows.append(
+                    {
+                        "key": f"llm_model_{state.index}",
+                        "requests_per_minute": len(state.window),
+                        "tokens_per_minute": state.window_tokens,
+                        "rpm_utilization": len(state.window) / self.rpm,
+                        "tpm_utilization": state.window_tokens / self.tpm,
+                        "in_flight": state.in_flight,
+                        "cooldown_seconds": max(0.0, state.cooldown_until - now),
+                        "total_requests": state.total_requests,
+                        "total_rate_limits": state.total_rate_limits,
+                        "total_failures": state.total_failures,
+                    }
+                )
+            return rows
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+# One pool per set of keys per process, so every session shares the limits
+def get_key_pool(keys):
+    keys = tuple(keys)
+    pool = _pools.get(keys)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(keys)
+            if pool is None:
+                pool = _pools[keys] = KeyPool(keys)
+    return pool
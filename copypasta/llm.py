@@ -0,0 +1,74 @@
+import logging
+import threading
+
+from . import config
+from .backends import BackendRouter, GeminiBackend, MockBackend, OpenAICompatibleBackend
+
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = "gemini-1.5-flash"
+
+_routers = {}
+_routers_lock = threading.Lock()
+
+
+# Function to read the API keys out of st.secrets["llm"] (or any mapping with
+# llm_model_0, llm_model_1, ... entries) in index order
+def load_llm_keys(secrets):
+    keys = []
+    index = 0
+    while f"llm_model_{index}" in secrets:
+        keys.append(secrets[f"llm_model_{index}"])
+        index += 1
+    return keys
+
+
+# Function to build the process-wide router over every configured backend:
+# Gemini from the llm_model_N keys in secrets["llm"], any OpenAI-compatible
+# servers listed under secrets["openai_compatible"] (each with base_url,
+# model and optionally api_key and timeout), and the mock server when
+# COPYPASTA_LLM_MOCK_URL is set. Routers are shared so sessions, key pools
+# and latency figures carry across Streamlit reruns.
+def load_backend(secrets):
+    llm_keys = load_llm_keys(secrets.get("llm", {}))
+    servers = list(secrets.get("openai_compatible", []))
+    identity = (
+        tuple(llm_keys),
+        tuple(tuple(sorted(dict(server).items())) for server in servers),
+        config.LLM_MOCK_URL,
+    )
+    with _routers_lock:
+        if identity not in _routers:
+            backends = []
+            if llm_keys:
+                backends.append(GeminiBackend(llm_keys, MODEL_NAME))
+            for server in servers:
+                backends.append(
+                    OpenAICompatibleBackend(
+                        server["base_url"],
+                        server["model"],
+                        api_key=server.get("api_key"),
+                        timeout=server.get("timeout"),
+                    )
+                )
+            if config.LLM_MOCK_URL:
+                backends.append(MockBackend(config.LLM_MOCK_URL))
+            _routers[identity] = BackendRouter(backends)
+        return _routers[identity]
+
+
+# Generator yielding the reply to copypasta_text piece by piece as the model
+# writes it. Replies are cached by the backend that served them: a cached
+# reply comes back as one piece, a fresh one is cached once it has streamed
+# to the end.
+def stream_llm(copypasta_text, backend, use_cache=True):
+    if use_cache:
+        return backend.cached_stream(copypasta_text)
+    return backend.stream(copypasta_text)
+
+
+# Function to send text to a backend (usually the router from load_backend)
+def call_llm(copypasta_text, backend, use_cache=True):
+    if use_cache:
+        return backend.cached_complete(copypasta_text)
+    return backend.complete(copypasta_text)
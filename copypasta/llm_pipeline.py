@@ -0,0 +1,79 @@
+# Runs an LLM call over many chunks of text with bounded parallelism while
+# keeping results in chunk order.
+import queue
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from . import config
+
+
+# Function to call call(chunk) for every chunk, at most concurrency at a time.
+# Returns the replies in chunk order; progress_callback(done, total, index) is
+# called as each chunk finishes. The first failing chunk's exception is
+# raised once the chunks already running have finished, and chunks not yet
+# started are cancelled.
+def map_chunks(chunks, call, concurrency=None, progress_callback=None):
+    if concurrency is None:
+        concurrency = config.LLM_CONCURRENCY
+    concurrency = max(1, min(concurrency, len(chunks) or 1))
+
+    replies = [None] * len(chunks)
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {executor.submit(call, chunk): i for i, chunk in enumerate(chunks)}
+        try:
+            for done, future in enumerate(as_completed(futures), 1):
+                index = futures[future]
+                replies[index] = future.result()
+                if progress_callback:
+                    progress_callback(done, len(chunks), index)
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+    return replies
+
+
+# Generator running stream_call(chunk) for every chunk, at most concurrency at
+# a time, and yielding (index, piece) in the order pieces arrive from any
+# chunk. Each chunk ends with an (index, None) event. Workers only put events
+# on a queue; everything is yielded on the caller's thread, so the caller can
+# draw on the page. A failing chunk raises after cancelling chunks not yet
+# started; closing the generator early does the same.
+def stream_chunks(chunks, stream_call, concurrency=None):
+    if concurrency is None:
+        concurrency = config.LLM_CONCURRENCY
+    concurrency = max(1, min(concurrency, len(chunks) or 1))
+
+    events = queue.Queue()
+
+    def run(index, chunk):
+        try:
+            for piece in stream_call(chunk):
+                events.put((index, piece))
+        finally:
+            events.put((index, None))
+
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    try:
+        futures = [executor.submit(run, i, chunk) for i, chunk in enumerate(chunks)]
+        finished = 0
+        while finished < len(chunks):
+            index, piece = events.get()
+            if piece is None:
+                finished += 1
+                futures[index].result()  # Raise the chunk's error, if any
+            yield index, piece
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Function to return the text that comes before the reply of page index in
+# join_pages: the rule separating it from the previous page and its heading
+def page_header(index):
+    separator = "\n\n---\n\n" if index else ""
+    return f"{separator}\n\n# Page {index + 1}\n"
+
+
+# Function to lay out chunk replies as "# Page N" sections separated by rules,
+# the format the Marketing Prompts page has always shown
+def join_pages(replies):
+    return "".join(page_header(i) + reply for i, reply in enumerate(replies))
@@ -0,0 +1,134 @@
+# A local stand-in for an LLM provider, used to exercise the chunk pipeline
+# offline. It speaks the OpenAI chat completions format, sleeps for a fixed
+# latency per request and replies with a short, deterministic summary of the
+# prompt it received, streamed word by word when the request asks for it.
+#
+#   with MockLLMServer(latency=0.5) as server:
+#       MockBackend(server.url).complete("some text")
+#
+# Run it standalone with: python -m copypasta.mock_llm --port 8765 --latency 0.5
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# Function to build the reply the mock gives for a prompt
+def mock_reply(prompt):
+    words = prompt.split()
+    return f"[mock] {len(words)} words: {' '.join(words[:8])}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        prompt = "".join(
+            message.get("content", "") for message in request.get("messages", [])
+        )
+
+        time.sleep(self.server.latency)
+        self.server.requests += 1
+
+        if request.get("stream"):
+            self._stream(request, mock_reply(prompt))
+            return
+
+        body = json.dumps(
+            {
+                "id": f"mock-{self.server.requests}",
+                "object": "chat.completion",
+                "model": request.get("model", "mock"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": mock_reply(prompt)},
+                        "finish_reason": "stop",
+                    }
+                ],
+            }
+        ).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    # Server-sent events in the OpenAI delta format, one word per event. The
+    # body has no length, so the connection closes when the reply is done.
+    def _stream(self, request, reply):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        for index, word in enumerate(reply.split(" ")):
+            piece = word if index == 0 else f" {word}"
+            event = {
+                "object": "chat.completion.chunk",
+                "model": request.get("model", "mock"),
+                "choices": [{"index": 0, "delta": {"content": piece}}],
+            }
+            self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockLLMServer:
+    def __init__(self, latency=0.0, host="127.0.0.1", port=0):
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.latency = latency
+        self._server.requests = 0
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    @property
+    def requests(self):
+        return self._server.requests
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local mock LLM server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.5)
+    args = parser.parse_args()
+
+    server = MockLLMServer(args.latency, args.host, args.port)
+    print(f"Mock LLM listening on {server.url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import io
+import math
+import threading
+
+import numpy as np
+
+from . import config
+from .errors import ExtractionError
+from .preprocess import preprocess
+
+# Images whose sides round up to the same multiple of this many pixels are
+# padded to one size and OCR'd in the same batch
+SIZE_BUCKET = 64
+
+_reader = None
+_reader_lock = threading.Lock()
+# True in processes that must run OCR themselves: the OCR service workers and
+# the PDF page workers
+_inline = False
+
+
+# Function to make this process run OCR in its own threads instead of handing
+# it to the OCR service
+def use_inline_ocr():
+    global _inline
+    _inline = True
+
+
+def _use_service():
+    return config.OCR_WORKERS > 0 and not _inline
+
+
+# Load the EasyOCR model once per process. Every page and every session shares
+# the same Reader instead of each page module building its own. easyocr (and
+# torch with it) is only imported here, the first time OCR actually runs.
+def load_easyocr_model():
+    global _reader
+    if _reader is None:
+        with _reader_lock:
+            if _reader is None:
+                from easyocr import Reader
+
+                _reader = Reader(["en"], gpu=False)
+    return _reader
+
+
+# Function to load the OCR model on a background thread (or start the OCR
+# service, whose workers load it) so it is ready by the time the first image
+# or scanned page arrives. Safe to call repeatedly.
+def warm_up():
+    if _use_service():
+        from .ocr_service import get_ocr_service
+
+        threading.Thread(target=get_ocr_service, daemon=True).start()
+    elif _reader is None and not _reader_lock.locked():
+        threading.Thread(target=load_easyocr_model, daemon=True).start()
+
+
+# Function to decode image bytes into the array OCR runs on, cleaned up with
+# the preprocessing profile configured for source
+def decode_image(image_bytes, source="image"):
+    from PIL import Image
+
+    try:
+        image = Image.open(io.BytesIO(image_bytes)).convert("RGB")
+    except (ValueError, OSError) as e:
+        raise ExtractionError(f"Error extracting text from image: {e}") from e
+
+    options = config.preprocess_options(source)
+    # Downsize the image if it's larger than 1080p, unless the profile scales
+    # it to a text height anyway
+    if not options.get("text_height") and (
+        (image.width > 1920 and image.height > 1080)
+        or (image.height > 1920 and image.width > 1080)
+    ):
+        image = image.resize((image.width // 2, image.height // 2))
+
+    return preprocess(np.array(image), options)
+
+
+# Function to extract text from an image using EasyOCR
+def extract_text_from_image(image_bytes):
+    return extract_text_from_array(decode_image(image_bytes))
+
+
+# Function to run OCR on an image that is already a NumPy array, through the
+# OCR service unless this process runs OCR inline
+def extract_text_from_array(image_np):
+    if _use_service():
+        from .ocr_service import get_ocr_service
+
+        return next(get_ocr_service().iter_text([image_np]))[1]
+    try:
+        result = load_easyocr_model().readtext(image_np, detail=0)
+    except ValueError as e:
+        raise ExtractionError(f"Error extracting text from image: {e}") from e
+    return " ".join(result)
+
+
+# Function to extract text from many images at once. Returns one string per
+# image, in input order.
+def extract_text_from_images(image_bytes_list, batch_size=None, progress_callback=None):
+    return extract_text_from_arrays(
+        [decode_image(image_bytes) for image_bytes in image_bytes_list],
+        batch_size,
+        progress_callback,
+    )
+
+
+# Function to OCR many arrays with batched detection and recognition. Returns
+# one string per array in input order; progress_callback(done, total, index)
+# is called as each image finishes.
+def extract_text_from_arrays(images, batch_size=None, progress_callback=None):
+    texts = [None] * len(images)
+    for done, (index, text) in enumerate(iter_text_from_arrays(images, batch_size), 1):
+        texts[index] = text
+        if progress_callback:
+            progress_callback(done, len(images), index)
+    return texts
+
+
+# Generator yielding (index, text) as each batch finishes. Arrays are grouped
+# by size, padded with white to a common shape inside each group and run
+# through the shared Reader batch_size at a time, so results arrive grouped by
+# size rather than in input order.
+def iter_text_from_arrays(images, batch_size=None):
+    # Nothing to OCR, so don't start the service or load the model
+    if not images:
+        return
+
+    if _use_service():
+        # The service batches images itself, across sessions
+        from .ocr_service import get_ocr_service
+
+        yield from get_ocr_service().iter_text(images)
+        return
+
+    if batch_size is None:
+        batch_size = config.OCR_BATCH_SIZE
+
+    groups = {}
+    for index, image_np in enumerate(images):
+        bucket = (
+            math.ceil(image_np.shape[0] / SIZE_BUCKET),
+            math.ceil(image_np.shape[1] / SIZE_BUCKET),
+        )
+        groups.setdefault(bucket, []).append(index)
+
+    for indexes in groups.values():
+        for i in range(0, len(indexes), batch_size):
+            batch = indexes[i : i + batch_size]
+            yield from zip(batch, _ocr_batch([images[j] for j in batch]))
+
+
+def _ocr_batch(images):
+    if len(images) == 1:
+        return [extract_text_from_array(images[0])]
+
+    height = max(image_np.shape[0] for image_np in images)
+    width = max(image_np.shape[1] for image_np in images)
+    padded = []
+    for image_np in images:
+        if image_np.shape[:2] != (height, width):
+            canvas = np.full((height, width) + image_np.shape[2:], 255, dtype=np.uint8)
+            canvas[: image_np.shape[0], : image_np.shape[1]] = image_np
+            image_np = canvas
+        padded.append(image_np)
+
+    try:
+        results = load_easyocr_model().readtext_batched(
+            padded, batch_size=len(padded), detail=0
+        )
+    except ValueError as e:
+        raise ExtractionError(f"Error extracting text from image: {e}") from e
+    return [" ".join(result) for result in results]
@@ -0,0 +1,195 @@
+# Local OCR service. Worker processes each load the OCR model once and take
+# images from one shared request queue; a worker that picks up an image waits
+# a few milliseconds for more to arrive and OCRs them together, so images
+# submitted close together by different sessions share a batch. The request
+# queue is bounded: when it is full, submissions wait briefly and then fail
+# with ExtractionError instead of piling up without limit.
+import itertools
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+
+from . import config
+from .errors import ExtractionError
+
+logger = logging.getLogger(__name__)
+
+_service = None
+_service_lock = threading.Lock()
+
+
+# Function to OCR a batch of arrays in a worker, one string per array
+def _ocr_inline(images):
+    from .ocr import extract_text_from_arrays
+
+    return extract_text_from_arrays(images)
+
+
+# Main loop of a worker process. ocr_batch is the function run on each batch
+# (a stand-in can be passed for benchmarks); None in the queue stops it.
+def _worker_main(requests, results, ocr_batch, batch_size, batch_window):
+    from . import ocr
+
+    ocr.use_inline_ocr()
+    if ocr_batch is _ocr_inline:
+        ocr.load_easyocr_model()
+
+    while True:
+        request = requests.get()
+        if request is None:
+            return
+        batch = [request]
+        deadline = time.monotonic() + batch_window
+        while len(batch) < batch_size:
+            try:
+                request = requests.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if request is None:
+                requests.put(None)  # leave the stop signal for this worker
+                break
+            batch.append(request)
+
+        job_ids = [job_id for job_id, _ in batch]
+        try:
+            texts = ocr_batch([image_np for _, image_np in batch])
+            results.put(
+                [(job_id, text, None) for job_id, text in zip(job_ids, texts)]
+            )
+        except Exception as e:
+            logger.exception("OCR batch failed")
+            results.put([(job_id, None, str(e)) for job_id in job_ids])
+
+
+class OCRService:
+    def __init__(
+        self,
+        workers=None,
+        queue_depth=None,
+        ocr_batch=None,
+        batch_size=None,
+        batch_window_ms=None,
+    ):
+        context = multiprocessing.get_context("spawn")
+        self.workers = workers or config.OCR_WORKERS
+        self.batch_size = batch_size or config.OCR_BATCH_SIZE
+        if batch_window_ms is None:
+            batch_window_ms = config.OCR_BATCH_WINDOW_MS
+        self.batch_window = batch_window_ms / 1000
+        self.max_queue_depth = queue_depth or config.OCR_QUEUE_DEPTH
+        self._requests = context.Queue(maxsize=self.max_queue_depth)
+        self._results = context.Queue()
+        self._ocr_batch = ocr_batch or _ocr_inline
+        self._futures = {}
+        self._futures_lock = threading.Lock()
+        self._ids = itertools.count()
+        self._context = context
+        self._processes = []
+        self._start_workers()
+        threading.Thread(target=self._dispatch, daemon=True).start()
+
+    def _start_workers(self):
+        self._processes = [p for p in self._processes if p.is_alive()]
+        while len(self._processes) < self.workers:
+            process = self._context.Process(
+                target=_worker_main,
+                args=(
+                    self._requests,
+                    self._results,
+                    self._ocr_batch,
+                    self.batch_size,
+                    self.batch_window,
+                ),
+                daemon=True,
+            )
+            process.start()
+            self._processes.append(process)
+
+    # Hands each result from the workers to the future waiting for it
+    def _dispatch(self):
+        while True:
+            for job_id, text, error in self._results.get():
+                with self._futures_lock:
+                    future = self._futures.pop(job_id, None)
+                if future is None:
+                    continue
+                if error is None:
+                    future.set_result(text)
+                else:
+                    future.set_exception(
+                        ExtractionError(f"Error extracting text from image: {error}")
+                    )
+
+    # Function to queue one image array for OCR and return a Future of its
+    # text. Raises ExtractionError when the queue stays full for
+    # config.OCR_SUBMIT_TIMEOUT seconds.
+    def submit(self, image_np):
+        if any(not process.is_alive() for process in self._processes):
+            logger.warning("Restarting OCR workers")
+            self._start_workers()
+        job_id = next(self._ids)
+        future = Future()
+        future.job_id = job_id
+        with self._futures_lock:
+            self._futures[job_id] = future
+        try:
+            self._requests.put((job_id, image_np), timeout=config.OCR_SUBMIT_TIMEOUT)
+        except queue.Full:
+            with self._futures_lock:
+                self._futures.pop(job_id, None)
+            raise ExtractionError("The OCR queue is full, please try again shortly")
+        return future
+
+    # Generator yielding (index, text) for each image as its OCR finishes.
+    # Images are submitted a window at a time, no more than the queue has
+    # room for when the call starts, so a large upload never fills the queue
+    # and refuses itself. Each result may take config.OCR_TIMEOUT seconds.
+    # Results of images still queued when the caller stops are dropped.
+    def iter_text(self, images):
+        images = enumerate(images)
+        window = max(1, self.max_queue_depth - (self.queue_depth() or 0))
+        futures = {}
+        try:
+            while True:
+                for index, image_np in images:
+                    futures[self.submit(image_np)] = index
+                    if len(futures) >= window:
+                        break
+                if not futures:
+                    return
+                finished, _ = wait(
+                    futures, timeout=config.OCR_TIMEOUT, return_when=FIRST_COMPLETED
+                )
+                if not finished:
+                    raise ExtractionError("OCR timed out")
+                for future in finished:
+                    yield futures.pop(future), future.result()
+        finally:
+            with self._futures_lock:
+                for future in futures:
+                    self._futures.pop(future.job_id, None)
+
+    def queue_depth(self):
+        try:
+            return self._requests.qsize()
+        except NotImplementedError:  # macOS
+            return None
+
+    def stop(self):
+        for _ in self._processes:
+            self._requests.put(None)
+        for process in self._processes:
+            process.join(timeout=5)
+
+
+# One service per process, started on first use and shared by every session
+def get_ocr_service():
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = OCRService()
+    return _service
@@ -0,0 +1,420 @@
+import io
+import itertools
+import math
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from . import config
+from .cache import cached, content_hash, file_hash, get_cache, make_key
+from .ocr import extract_text_from_array, extract_text_from_arrays
+from .pdf_classify import BOTH, OCR, choose_dpi, classify_page, image_stats
+from .preprocess import prepare_for_ocr
+
+
+# A PDF opened once for the whole extraction: PyPDF2 reads the text layer and
+# PyMuPDF classifies and renders pages. The PDF is given as bytes or as the
+# path of a file, which both libraries then read from disk as needed. The
+# PyMuPDF document is opened lazily on first use.
+class PdfDocument:
+    def __init__(self, pdf_bytes=None, path=None):
+        import PyPDF2
+
+        self.pdf_bytes = pdf_bytes
+        self.path = path
+        if path is not None:
+            self._file = open(path, "rb")
+        else:
+            self._file = io.BytesIO(pdf_bytes)
+        self.reader = PyPDF2.PdfReader(self._file)
+        self._fitz_doc = None
+        self._digest = None
+
+    # What a worker process needs to open the same PDF: the path when there
+    # is one, so the bytes aren't copied into every worker
+    @property
+    def source(self):
+        return self.path if self.path is not None else self.pdf_bytes
+
+    @property
+    def digest(self):
+        if self._digest is None:
+            if self.path is not None:
+                self._digest = file_hash(self.path)
+            else:
+                self._digest = content_hash(self.pdf_bytes)
+        return self._digest
+
+    @property
+    def pages(self):
+        return self.reader.pages
+
+    @property
+    def fitz_doc(self):
+        if self._fitz_doc is None:
+            import fitz  # PyMuPDF
+
+            if self.path is not None:
+                self._fitz_doc = fitz.open(self.path, filetype="pdf")
+            else:
+                self._fitz_doc = fitz.open(stream=self.pdf_bytes, filetype="pdf")
+        return self._fitz_doc
+
+    def close(self):
+        if self._fitz_doc is not None:
+            self._fitz_doc.close()
+            self._fitz_doc = None
+        self._file.close()
+
+
+# Function to read the raw bytes out of bytes or a file-like object
+def _read_pdf_bytes(pdf_file):
+    if isinstance(pdf_file, (bytes, bytearray)):
+        return bytes(pdf_file)
+    pdf_file.seek(0)
+    return pdf_file.read()
+
+
+# Function to open a PDF from bytes, a file-like object or a path
+def open_pdf(pdf_file):
+    if isinstance(pdf_file, PdfDocument):
+        return pdf_file
+    if isinstance(pdf_file, (str, os.PathLike)):
+        return PdfDocument(path=os.fspath(pdf_file))
+    return PdfDocument(_read_pdf_bytes(pdf_file))
+
+
+# Function to turn 1-based inclusive page numbers into clamped 0-based ones
+def _page_range(num_pages, start_page, end_page):
+    start_page = max(0, start_page - 1)
+    end_page = min(num_pages - 1, end_page - 1)
+    return start_page, end_page
+
+
+# Function to build the cache key of one page's text. Pages are cached by
+# document hash, page index and render settings, so overlapping page ranges
+# and later "all pages" runs reuse work already done.
+def _page_cache_key(pdf_document, page_num):
+    return make_key(
+        "pdf_page", pdf_document.digest, page=page_num, **config.ocr_options()
+    )
+
+
+# Function to extract the text of a single page, from the page cache if it
+# has been extracted before
+def extract_page_text(pdf_document, page_num):
+    return cached(
+        _page_cache_key(pdf_document, page_num),
+        lambda: _extract_pages_text(pdf_document, [page_num])[0],
+    )
+
+
+# Function to read the text layer of pages and let classify_page decide
+# whether OCR replaces it, is merged with it, or is skipped altogether.
+# Returns (page_text, decision) per page.
+def _classify_pages(pdf_document, page_nums):
+    classified = []
+    for page_num in page_nums:
+        page_text = pdf_document.pages[page_num].extract_text() or ""
+        decision = classify_page(pdf_document.fitz_doc.load_page(page_num), page_text)
+        classified.append((page_text, decision))
+    return classified
+
+
+def _needs_ocr(decision):
+    return decision.route in (OCR, BOTH)
+
+
+# Function to combine a page's text layer with its OCR text as its route says
+def _merge_ocr_text(page_text, decision, ocr_text):
+    if decision.route == OCR:
+        return ocr_text or ""
+    return "\n".join(text for text in (page_text.strip(), ocr_text) if text)
+
+
+# Function to render a page and clean it up for OCR
+def _render_for_ocr(pdf_document, page_num, dpi):
+    return prepare_for_ocr(render_page(pdf_document, page_num, dpi), "pdf")
+
+
+# Function to extract the text of several pages. Every page that needs OCR
+# goes through one batched call.
+def _extract_pages_text(pdf_document, page_nums):
+    classified = _classify_pages(pdf_document, page_nums)
+    page_texts = [page_text for page_text, _ in classified]
+    ocr_indexes = [
+        i for i, (_, decision) in enumerate(classified) if _needs_ocr(decision)
+    ]
+    if not ocr_indexes:
+        return page_texts
+    ocr_texts = extract_text_from_arrays(
+        [
+            _render_for_ocr(pdf_document, page_nums[i], classified[i][1].dpi)
+            for i in ocr_indexes
+        ]
+    )
+    for i, ocr_text in zip(ocr_indexes, ocr_texts):
+        page_texts[i] = _merge_ocr_text(*classified[i], ocr_text)
+    return page_texts
+
+
+# Function to split pages into the ones already in the page cache and the ones
+# still to extract
+def _cached_pages(pdf_document, page_nums):
+    cache = get_cache()
+    found = {}
+    pending = []
+    for page_num in page_nums:
+        page_text = cache.get(_page_cache_key(pdf_document, page_num))
+        if page_text is None:
+            pending.append(page_num)
+        else:
+            found[page_num] = page_text
+    return found, pending
+
+
+# Function to join page texts the way the pages have always shown them
+def _join_pages(page_texts):
+    return "".join(page_text + "\n" for page_text in page_texts if page_text)
+
+
+# Function to extract text from a PDF in the calling process. Pages are
+# 1-based and inclusive; progress_callback(done, total, page_num) is called as
+# each page finishes.
+def extract_text_from_pdf(pdf_document, start_page, end_page, progress_callback=None):
+    return extract_text_from_pdf_parallel(
+        pdf_document, start_page, end_page, 1, progress_callback
+    )
+
+
+# Pool of processes that render pages for OCR, started on first use and kept
+# so the spawn cost is paid once, not on every PDF. One pool per size.
+_render_pools = {}
+_render_pools_lock = threading.Lock()
+
+# PDFs open in a render worker by (path, digest), so each document is opened
+# once for all of its batches. Only the most recent few are kept.
+_worker_documents = {}
+WORKER_DOCUMENTS = 4
+
+
+def _get_render_pool(workers, broken=None):
+    with _render_pools_lock:
+        pool = _render_pools.get(workers)
+        if pool is None or pool is broken:
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+            # spawn rather than fork: the parent may hold torch and Streamlit
+            # threads
+            pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            _render_pools[workers] = pool
+        return pool
+
+
+# Function run in a render worker: renders and preprocesses (page_num, dpi)
+# pages of the PDF at path and returns (page_num, array) for each. The OCR
+# itself is left to the calling process, which sends the arrays to the OCR
+# service so every page shares its one model.
+def _render_pages(path, digest, pages):
+    key = (path, digest)
+    pdf_document = _worker_documents.pop(key, None)
+    if pdf_document is None:
+        if len(_worker_documents) >= WORKER_DOCUMENTS:
+            _worker_documents.pop(next(iter(_worker_documents))).close()
+        pdf_document = open_pdf(path)
+    _worker_documents[key] = pdf_document
+    return [
+        (page_num, _render_for_ocr(pdf_document, page_num, dpi))
+        for page_num, dpi in pages
+    ]
+
+
+# Function to extract text from a PDF with page ranges spread across a process
+# pool. Output is identical to extract_text_from_pdf; progress_callback(done,
+# total, page_num) is called as each page finishes. The PDF may be bytes, a
+# file-like object, a path or an open PdfDocument.
+def extract_text_from_pdf_parallel(
+    pdf_file, start_page, end_page, workers=None, progress_callback=None
+):
+    return _join_pages(
+        page_text
+        for _, page_text in iter_pdf_pages(
+            pdf_file, start_page, end_page, workers, progress_callback
+        )
+    )
+
+
+# Generator yielding (page_num, page_text) in page order as soon as each page
+# and every page before it is done, so callers can show text while the rest
+# is still being extracted. Pages already in the page cache are skipped, and
+# only pages that need OCR are rendered on the pool. Closing the generator
+# early cancels pages that have not started yet.
+def iter_pdf_pages(
+    pdf_file, start_page, end_page, workers=None, progress_callback=None
+):
+    if workers is None:
+        workers = config.PDF_WORKERS
+
+    pdf_document = open_pdf(pdf_file)
+    extracted = None
+    try:
+        first, last = _page_range(len(pdf_document.pages), start_page, end_page)
+        page_nums = list(range(first, last + 1))
+
+        found, pending = _cached_pages(pdf_document, page_nums)
+        results = {}
+        position = 0
+        finished = list(found.items())
+        extracted = _extract_pending(pdf_document, pending, workers)
+        while True:
+            for page_num, page_text in finished:
+                results[page_num] = page_text
+                if progress_callback:
+                    progress_callback(
+                        position + len(results), len(page_nums), page_num
+                    )
+            # Release every page that is now contiguous with those already out
+            while position < len(page_nums) and page_nums[position] in results:
+                page_num = page_nums[position]
+                yield page_num, results.pop(page_num)
+                position += 1
+            finished = [next(extracted, None)]
+            if finished[0] is None:
+                return
+    finally:
+        if extracted is not None:
+            extracted.close()
+        # A document opened here is closed here; one passed in is the caller's
+        if pdf_document is not pdf_file:
+            pdf_document.close()
+
+
+# Generator yielding (page_num, page_text) for pages not in the cache, in the
+# order they finish. Pages are classified here first: those that don't need
+# OCR are done straight away, and the rest are rendered (on the pool when
+# there are enough of them and workers > 1) and OCR'd a batch at a time.
+def _extract_pending(pdf_document, pending, workers):
+    cache = get_cache()
+    ocr_pages = {}
+    for page_num, (page_text, decision) in zip(
+        pending, _classify_pages(pdf_document, pending)
+    ):
+        if _needs_ocr(decision):
+            ocr_pages[page_num] = (page_text, decision)
+        else:
+            cache.set(_page_cache_key(pdf_document, page_num), page_text)
+            yield page_num, page_text
+    if not ocr_pages:
+        return
+
+    pages = [(page_num, decision.dpi) for page_num, (_, decision) in ocr_pages.items()]
+    if workers <= 1 or len(pages) < config.PDF_PARALLEL_MIN_PAGES:
+        rendered = _render_serially(pdf_document, pages)
+    else:
+        rendered = _render_on_pool(pdf_document, pages, workers)
+    try:
+        for batch in rendered:
+            ocr_texts = extract_text_from_arrays([image_np for _, image_np in batch])
+            for (page_num, _), ocr_text in zip(batch, ocr_texts):
+                page_text = _merge_ocr_text(*ocr_pages[page_num], ocr_text)
+                cache.set(_page_cache_key(pdf_document, page_num), page_text)
+                yield page_num, page_text
+    finally:
+        rendered.close()
+
+
+# Generator yielding lists of (page_num, array) for (page_num, dpi) pages,
+# OCR_BATCH_SIZE pages at a time, rendered in this process
+def _render_serially(pdf_document, pages):
+    for i in range(0, len(pages), config.OCR_BATCH_SIZE):
+        yield [
+            (page_num, _render_for_ocr(pdf_document, page_num, dpi))
+            for page_num, dpi in pages[i : i + config.OCR_BATCH_SIZE]
+        ]
+
+
+# Function to queue batches of pages on the render pool and return their
+# futures. A worker that died in an earlier run (e.g. killed for memory)
+# breaks the whole pool, so a broken pool is replaced once.
+def _submit_renders(workers, path, digest, batches, retry=True):
+    if not batches:
+        return []
+    pool = _get_render_pool(workers)
+    try:
+        return [pool.submit(_render_pages, path, digest, batch) for batch in batches]
+    except BrokenProcessPool:
+        if not retry:
+            raise
+        _get_render_pool(workers, broken=pool)
+        return _submit_renders(workers, path, digest, batches, retry=False)
+
+
+# Generator yielding lists of (page_num, array) for (page_num, dpi) pages as
+# the render pool finishes them. At most two batches per worker are rendered
+# ahead of the caller, so rendered pages don't pile up in memory while the OCR
+# catches up. Workers open the PDF from disk, so a PDF held in memory is
+# written to a temporary file first.
+def _render_on_pool(pdf_document, pages, workers):
+    batch_size = max(1, min(config.OCR_BATCH_SIZE, math.ceil(len(pages) / workers)))
+    batches = iter(
+        [pages[i : i + batch_size] for i in range(0, len(pages), batch_size)]
+    )
+
+    path, temp_path = pdf_document.path, None
+    if path is None:
+        with tempfile.NamedTemporaryFile(
+            prefix="copypasta-", suffix=".pdf", delete=False
+        ) as f:
+            f.write(pdf_document.pdf_bytes)
+        path = temp_path = f.name
+
+    def submit(count):
+        next_batches = list(itertools.islice(batches, count))
+        return set(_submit_renders(workers, path, pdf_document.digest, next_batches))
+
+    futures = set()
+    try:
+        futures = submit(workers * 2)
+        while futures:
+            finished, futures = wait(futures, return_when=FIRST_COMPLETED)
+            futures |= submit(len(finished))
+            for future in finished:
+                yield future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+        if temp_path is not None:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+
+# Function to rasterize a page straight into an RGB NumPy array, with no
+# intermediate PDF or PNG encode/decode
+def render_page(pdf_document, page_num, dpi=72):
+    import fitz  # PyMuPDF
+
+    page = pdf_document.fitz_doc.load_page(page_num)
+    pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csRGB, alpha=False)
+    return np.frombuffer(pix.samples, dtype=np.uint8).reshape(
+        pix.height, pix.width, pix.n
+    )
+
+
+# Function to extract text from a PDF page image using OCR. Without a dpi the
+# page is rendered at the DPI that fits the configured pixel budget.
+def extract_text_from_pdf_image(pdf_document, page_num, dpi=None):
+    if dpi is None:
+        fitz_page = pdf_document.fitz_doc.load_page(page_num)
+        dpi = choose_dpi(fitz_page, image_stats(fitz_page)[1])
+    return extract_text_from_array(
+        prepare_for_ocr(render_page(pdf_document, page_num, dpi), "pdf")
+    )
@@ -0,0 +1,97 @@
+# Decide per PDF page whether the text layer is enough, whether the page has
+# to be OCR'd, or whether both should be merged, and at what DPI to render.
+import math
+from collections import namedtuple
+
+from . import config
+
+NATIVE = "native"
+OCR = "ocr"
+BOTH = "both"
+
+# Fewer visible characters than this and the text layer is treated as empty
+MIN_GLYPHS = 2
+# Below this share of readable characters the text layer is font garbage
+MIN_READABLE_RATIO = 0.8
+# Pages with at least this much of their area covered by images and fewer
+# glyphs than DENSE_GLYPHS get OCR on top of their text layer
+IMAGE_COVERAGE_FOR_BOTH = 0.5
+DENSE_GLYPHS = 200
+
+PageDecision = namedtuple("PageDecision", ["route", "dpi", "glyphs", "image_coverage"])
+
+
+# Function to count visible characters and the share of them that are readable
+# (not U+FFFD, not private-use code points that broken font maps produce)
+def text_stats(page_text):
+    glyphs = [ch for ch in page_text if not ch.isspace()]
+    if not glyphs:
+        return 0, 0.0
+    readable = sum(
+        1
+        for ch in glyphs
+        if ch.isprintable() and ch != "\ufffd" and not 0xE000 <= ord(ch) <= 0xF8FF
+    )
+    return len(glyphs), readable / len(glyphs)
+
+
+# Function to estimate the share of the page covered by images, and the
+# highest native resolution any of them has on the page
+def image_stats(fitz_page):
+    page_area = abs(fitz_page.rect)
+    if not page_area:
+        return 0.0, None
+
+    covered = 0.0
+    native_dpi = None
+    for info in fitz_page.get_image_info():
+        bbox = fitz_page.rect & info["bbox"]
+        if bbox.is_empty:
+            continue
+        covered += abs(bbox)
+        width_inches = bbox.width / 72
+        if width_inches > 0:
+            dpi = info["width"] / width_inches
+            native_dpi = dpi if native_dpi is None else max(native_dpi, dpi)
+    return min(1.0, covered / page_area), native_dpi
+
+
+# Function to pick a render DPI that puts the page near the pixel budget.
+# Never renders above the resolution of the page's own images, since the
+# extra pixels carry no detail and only slow OCR down.
+def choose_dpi(fitz_page, native_dpi=None, pixel_budget=None):
+    if pixel_budget is None:
+        pixel_budget = config.OCR_PIXEL_BUDGET
+    area_inches = (fitz_page.rect.width / 72) * (fitz_page.rect.height / 72)
+    if area_inches <= 0:
+        return config.OCR_MIN_DPI
+
+    dpi = math.sqrt(pixel_budget / area_inches)
+    if native_dpi:
+        dpi = min(dpi, native_dpi)
+    return int(max(config.OCR_MIN_DPI, min(config.OCR_MAX_DPI, dpi)))
+
+
+# Function to route a page to NATIVE, OCR or BOTH from its text layer and its
+# PyMuPDF page
+def classify_page(fitz_page, page_text):
+    glyphs, readable_ratio = text_stats(page_text)
+    image_coverage, native_dpi = image_stats(fitz_page)
+    dpi = choose_dpi(fitz_page, native_dpi)
+
+    if glyphs < MIN_GLYPHS or readable_ratio < MIN_READABLE_RATIO:
+        # Nothing to OCR on a page with no images, no vector drawings and no
+        # text of any kind; text PyPDF2 couldn't read still gets OCR'd
+        if (
+            not image_coverage
+            and not fitz_page.get_drawings()
+            and not fitz_page.get_text().strip()
+        ):
+            route = NATIVE
+        else:
+            route = OCR
+    elif image_coverage >= IMAGE_COVERAGE_FOR_BOTH and glyphs < DENSE_GLYPHS:
+        route = BOTH
+    else:
+        route = NATIVE
+    return PageDecision(route, dpi, glyphs, image_coverage)
@@ -0,0 +1,197 @@
+# Image cleanup ahead of OCR, done on whole NumPy arrays at once: grayscale,
+# border crop, deskew, contrast stretch and scaling to a target text height.
+# Which steps run is set per source by the profiles in config.
+import numpy as np
+
+from . import config
+
+# Gray levels a pixel may differ from the border colour and still count as
+# border
+CROP_TOLERANCE = 24
+# Pixels of border left around the content after cropping
+CROP_MARGIN = 8
+# Ink pixels sampled when estimating skew
+SKEW_SAMPLES = 20_000
+SKEW_STEP = 0.25  # degrees between candidate angles
+
+
+# Function to convert an RGB array to 8-bit grayscale (ITU-R 601 luma)
+def to_grayscale(image_np):
+    if image_np.ndim == 2:
+        return image_np
+    weights = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    return (image_np[..., :3].astype(np.float32) @ weights).astype(np.uint8)
+
+
+# Function to return a boolean mask of the pixels that are text: pixels
+# clearly darker than the average of their neighbourhood (lighter, on dark
+# images). Comparing against the local mean rather than one global threshold
+# keeps shadows, dark borders and uneven lighting out of the mask.
+def ink_mask(gray):
+    radius = max(4, min(gray.shape) // 40)
+    size = 2 * radius + 1
+    padded = np.pad(gray, radius, mode="edge").astype(np.int64)
+    integral = np.pad(padded.cumsum(axis=0).cumsum(axis=1), ((1, 0), (1, 0)))
+    window = (
+        integral[size:, size:]
+        - integral[:-size, size:]
+        - integral[size:, :-size]
+        + integral[:-size, :-size]
+    )
+    local_mean = window / (size * size)
+    if np.median(gray) < 128:
+        return gray > local_mean + np.maximum(12, 0.2 * (255 - local_mean))
+    return gray < local_mean - np.maximum(12, 0.2 * local_mean)
+
+
+# Function to take every step-th pixel so estimates run on at most max_side
+# pixels along the shorter side. Returns the sample and the step.
+def _sample(gray, max_side=600):
+    step = max(1, -(-min(gray.shape) // max_side))
+    return gray[::step, ::step], step
+
+
+# Median gray level of the outermost rows and columns
+def _border(gray):
+    return np.median(np.concatenate([gray[0], gray[-1], gray[:, 0], gray[:, -1]]))
+
+
+# Function to crop away borders that are a uniform colour, taken from the
+# median of the image's edge pixels
+def crop_borders(gray, tolerance=CROP_TOLERANCE, margin=CROP_MARGIN):
+    background = _border(gray)
+    content = np.abs(gray.astype(np.int16) - background) > tolerance
+    rows = np.flatnonzero(content.any(axis=1))
+    cols = np.flatnonzero(content.any(axis=0))
+    if rows.size == 0 or cols.size == 0:
+        return gray
+    top = max(rows[0] - margin, 0)
+    bottom = min(rows[-1] + margin + 1, gray.shape[0])
+    left = max(cols[0] - margin, 0)
+    right = min(cols[-1] + margin + 1, gray.shape[1])
+    return gray[top:bottom, left:right]
+
+
+# Function to estimate how many degrees text lines are tilted, within
+# max_degrees. Every candidate angle projects a sample of ink pixels onto the
+# vertical axis in one matrix product; the angle whose row histogram is the
+# most peaked (lines lined up) wins.
+def estimate_skew(gray, max_degrees):
+    ys, xs = np.nonzero(ink_mask(_sample(gray)[0]))
+    if ys.size < 100:
+        return 0.0
+    if ys.size > SKEW_SAMPLES:
+        pick = np.random.default_rng(0).choice(ys.size, SKEW_SAMPLES, replace=False)
+        ys, xs = ys[pick], xs[pick]
+
+    angles = np.arange(-max_degrees, max_degrees + SKEW_STEP, SKEW_STEP)
+    radians = np.deg2rad(angles)[:, None]
+    projected = ys[None, :] * np.cos(radians) - xs[None, :] * np.sin(radians)
+    projected = np.round(projected - projected.min(axis=1, keepdims=True)).astype(
+        np.int64
+    )
+    bins = int(projected.max()) + 1
+    offsets = (np.arange(len(angles)) * bins)[:, None]
+    histograms = np.bincount(
+        (projected + offsets).ravel(), minlength=len(angles) * bins
+    ).reshape(len(angles), bins)
+    scores = (histograms.astype(np.float64) ** 2).sum(axis=1)
+    return float(angles[scores.argmax()])
+
+
+# Function to rotate a grayscale image by degrees, filling the corners with
+# the border colour so rotation adds no new edges
+def rotate(gray, degrees):
+    from PIL import Image
+
+    rotated = Image.fromarray(gray).rotate(
+        degrees, resample=Image.BILINEAR, expand=True, fillcolor=int(_border(gray))
+    )
+    return np.asarray(rotated)
+
+
+# Function to stretch gray levels so the darkest and lightest 1% of pixels
+# become black and white
+def stretch_contrast(gray):
+    # Percentiles from the 256-bin histogram, far cheaper than sorting
+    cumulative = np.cumsum(np.bincount(gray.ravel(), minlength=256))
+    low, high = np.searchsorted(cumulative, [0.01 * gray.size, 0.99 * gray.size])
+    if high - low < 1:
+        return gray
+    # One lookup table applied to every pixel
+    levels = (np.arange(256, dtype=np.float32) - low) * (255.0 / (high - low))
+    return np.clip(levels, 0, 255).astype(np.uint8)[gray]
+
+
+# Function to return the start and end of each run of True in a 1-D mask
+def _runs(mask):
+    edges = np.diff(np.concatenate([[0], mask.astype(np.int8), [0]]))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+# Function to estimate the height of a line of text in pixels, about the font
+# size: the median height of runs of rows holding any ink, from ascenders to
+# descenders. Lines set so tight that they touch are capped by the line
+# pitch, the median distance between the dense middles of the lines.
+def estimate_text_height(gray):
+    sample, step = _sample(gray)
+    profile = ink_mask(sample).mean(axis=1)
+    low, high = np.percentile(profile, (10, 90))
+    if high - low < 0.005:
+        return None
+    starts, ends = _runs(profile > low + 0.02 * (high - low))
+    if starts.size == 0:
+        return None
+    height = float(np.median(ends - starts))
+    cores, _ = _runs(profile > low + 0.3 * (high - low))
+    if cores.size > 2:
+        height = min(height, float(np.median(np.diff(cores))))
+    return height * step
+
+
+# Function to scale an image down so its text lines are about text_height
+# pixels tall, shrinking by at most max_scale. Small text is only scaled up
+# when upscale is set, since that multiplies the pixels OCR has to read.
+def scale_to_text_height(gray, text_height, max_scale=2.0, upscale=False):
+    from PIL import Image
+
+    current = estimate_text_height(gray)
+    if not current:
+        return gray
+    scale = min(max(text_height / current, 1 / max_scale), max_scale)
+    if not upscale:
+        scale = min(scale, 1.0)
+    if abs(scale - 1) < 0.1:
+        return gray
+    size = (max(1, round(gray.shape[1] * scale)), max(1, round(gray.shape[0] * scale)))
+    return np.asarray(Image.fromarray(gray).resize(size, Image.BILINEAR))
+
+
+# Function to run the steps of a preprocessing profile (a dict of options
+# from config.PREPROCESS_PROFILES) over an image array
+def preprocess(image_np, options):
+    if not options:
+        return image_np
+    image = to_grayscale(image_np) if options.get("grayscale") else image_np
+    if image.ndim == 2:
+        if options.get("crop"):
+            image = crop_borders(image)
+        if options.get("deskew"):
+            angle = estimate_skew(image, options["deskew"])
+            if abs(angle) >= SKEW_STEP:
+                image = rotate(image, angle)
+        if options.get("contrast"):
+            image = stretch_contrast(image)
+        if options.get("text_height"):
+            image = scale_to_text_height(
+                image,
+                options["text_height"],
+                options.get("max_scale", 2.0),
+                options.get("upscale", False),
+            )
+    return np.ascontiguousarray(image)
+
+
+# Function to preprocess an image with the profile configured for its source
+def prepare_for_ocr(image_np, source):
+    return preprocess(image_np, config.preprocess_options(source))
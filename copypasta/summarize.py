@@ -0,0 +1,89 @@
+# Hierarchical map-reduce summarization. The text is split into chunks that
+# are summarized in parallel (map), then the partial summaries are combined
+# fan_in at a time, level by level, until one summary is left (reduce).
+from . import config
+from .chunking import (
+    CHARS_PER_TOKEN,
+    build_prompts,
+    chunk_token_budget,
+    estimate_tokens,
+)
+from .llm_pipeline import join_pages, map_chunks
+
+
+# Function to group partial summaries for one reduce level: at most fan_in per
+# group, and never more than the model's token budget once joined. A summary
+# longer than half the budget is cut to half, so every group but the last
+# takes at least two and each level makes fewer requests than the one before,
+# however long the model's replies are.
+def _reduce_groups(summaries, fan_in, max_tokens):
+    half = max(1, max_tokens // 2)
+    summaries = [summary[: half * CHARS_PER_TOKEN] for summary in summaries]
+    groups = [[]]
+    tokens = 0
+    for summary in summaries:
+        summary_tokens = estimate_tokens(summary)
+        group = groups[-1]
+        if group and (len(group) >= fan_in or tokens + summary_tokens > max_tokens):
+            groups.append([])
+            tokens = 0
+        groups[-1].append(summary)
+        tokens += summary_tokens
+    return groups
+
+
+# Function to summarize text of any length. map_prompt is applied to every
+# chunk, reduce_prompt to every group of partial summaries; the final reduce
+# always runs, so short text gets map_prompt then reduce_prompt once. With a
+# caching call (such as llm.call_llm, which caches per backend) every step
+# is stored, so an interrupted summary resumes where it stopped.
+# progress_callback(level, done, total) is called as each step finishes, with
+# level 0 for the map step. With stream_call (such as llm.stream_llm) the
+# final reduce is streamed and on_token(piece) is called as each piece of the
+# summary arrives.
+def summarize(
+    text,
+    map_prompt,
+    reduce_prompt,
+    call,
+    model_name=None,
+    fan_in=None,
+    concurrency=None,
+    progress_callback=None,
+    stream_call=None,
+    on_token=None,
+):
+    if fan_in is None:
+        fan_in = config.SUMMARY_FAN_IN
+    fan_in = max(2, fan_in)
+    max_tokens = chunk_token_budget(model_name) - estimate_tokens(reduce_prompt)
+
+    def level_progress(level):
+        if not progress_callback:
+            return None
+        return lambda done, total, index: progress_callback(level, done, total)
+
+    summaries = map_chunks(
+        build_prompts(text, map_prompt, model_name),
+        call,
+        concurrency,
+        level_progress(0),
+    )
+
+    level = 1
+    while True:
+        requests = [
+            f"{join_pages(group)}\n\n{reduce_prompt}"
+            for group in _reduce_groups(summaries, fan_in, max_tokens)
+        ]
+        if len(requests) == 1 and stream_call is not None:
+            pieces = []
+            for piece in stream_call(requests[0]):
+                pieces.append(piece)
+                if on_token:
+                    on_token(piece)
+            return "".join(pieces)
+        summaries = map_chunks(requests, call, concurrency, level_progress(level))
+        if len(summaries) == 1:
+            return summaries[0]
+        level += 1
@@ -0,0 +1,222 @@
+# Streamlit glue shared by the pages. Kept apart from the engine modules so the
+# CLI never has to import streamlit.
+import uuid
+
+import streamlit as st
+
+from . import config, ocr
+from .bulk import extract_urls, join_results, parse_urls
+from .cache import content_hash, make_key
+from .errors import CopypastaError
+from .extract import extract_url, iter_images, iter_pdf
+from .jobs import FAILED, QUEUED, get_job_manager
+
+if config.OCR_WARMUP == "startup":
+    ocr.warm_up()
+
+
+# Function to build a progress_callback that writes into an st.empty element
+def progress_reporter(progress_text):
+    def report(done, total, page_num):
+        progress = done / total
+        progress_text.text(f"Progress: {progress:.0%} ({done}/{total})")
+
+    return report
+
+
+# Function to return an id for this browser session, used as the owner of
+# the background jobs it starts
+def _session_id():
+    if "copypasta_session" not in st.session_state:
+        st.session_state["copypasta_session"] = uuid.uuid4().hex
+    return st.session_state["copypasta_session"]
+
+
+# Function to run work(job) as a background job whose text ends up in
+# st.session_state[state_key]. key is a hash of the job's input, so a session
+# starting the same work as another joins it instead of repeating it. The job
+# keeps running across reruns; show_job draws it.
+def start_job(state_key, key, work, kind):
+    manager = get_job_manager()
+    job_key = f"{state_key}_job"
+    previous = st.session_state.get(job_key)
+    job = manager.submit(key, work, owner=_session_id(), kind=kind)
+    if previous and previous != job.id:
+        manager.cancel(previous, _session_id())
+    st.session_state[job_key] = job.id
+    st.session_state.pop(state_key, None)
+    return job
+
+
+# Function to move a finished (or stopped) job's text into session_state.
+# Partial text from a failed or stopped job is kept so it can still be copied.
+def _finish_job(state_key, job):
+    st.session_state.pop(f"{state_key}_job", None)
+    if job.status == FAILED:
+        st.session_state[f"{state_key}_job_error"] = job.error
+    text = job.text.strip()
+    if text:
+        st.session_state[state_key] = text
+
+
+# Function to show the progress and text so far of the job started for
+# state_key, or to collect its result once it has finished. render draws the
+# partial text (st.text or st.markdown).
+def show_job(state_key, render=st.text):
+    job_id = st.session_state.get(f"{state_key}_job")
+    job = get_job_manager().get(job_id) if job_id else None
+    if job is not None and not job.finished:
+        _job_panel(state_key, render)
+    elif job is not None:
+        _finish_job(state_key, job)
+    else:
+        st.session_state.pop(f"{state_key}_job", None)
+
+    error = st.session_state.pop(f"{state_key}_job_error", None)
+    if error:
+        st.error(error)
+
+
+# Redrawn on its own every config.JOB_POLL_SECONDS while the job runs; the
+# whole page reruns once the job is over so its text shows up
+@st.fragment(run_every=config.JOB_POLL_SECONDS)
+def _job_panel(state_key, render):
+    job = get_job_manager().get(st.session_state.get(f"{state_key}_job"))
+    if job is None or job.finished:
+        st.rerun()
+
+    if st.button("Stop", key=f"{state_key}_stop"):
+        # Other sessions sharing the job keep it running
+        get_job_manager().cancel(job.id, _session_id())
+        _finish_job(state_key, job)
+        st.rerun()
+
+    if job.total:
+        step = job.step or "Progress"
+        st.text(f"{step}: {job.done / job.total:.0%} ({job.done}/{job.total})")
+    elif job.status == QUEUED:
+        st.text("Waiting for other jobs to finish...")
+    else:
+        st.text("Working...")
+    render(job.text)
+
+
+# Input type selector and extract buttons shared by both pages. The extracted
+# text is stored in st.session_state[state_key].
+def extraction_inputs(state_key):
+    # Option to choose between URL, PDF, and Image
+    option = st.radio(
+        "## Choose input type:", ("Website Links", "PDF", "Image (Multiple Allowed)")
+    )
+
+    # Start loading the OCR model while the user picks a file
+    if option != "Website Links" and config.OCR_WARMUP == "on-demand":
+        ocr.warm_up()
+
+    if option == "Website Links":
+        _website_inputs(state_key)
+    elif option == "Image (Multiple Allowed)":
+        _image_inputs(state_key)
+    elif option == "PDF":
+        _pdf_inputs(state_key)
+
+    # Progress of a PDF or image extraction, which survives reruns
+    show_job(state_key)
+
+
+def _website_inputs(state_key):
+    # Input box for URLs, one per line
+    urls = parse_urls(st.text_area("Enter the Website Links (one per line):"))
+
+    # Button to extract text
+    if st.button("Extract Text"):
+        if len(urls) > 1:
+            _bulk_website_extraction(state_key, urls)
+        elif urls:
+            progress_text = st.empty()
+            try:
+                with st.spinner("Extracting..."):
+                    main_text = extract_url(urls[0], progress_reporter(progress_text))
+            except CopypastaError as e:
+                st.error(str(e))
+                main_text = None
+            progress_text.empty()
+
+            if main_text:
+                st.session_state[state_key] = main_text
+        else:
+            st.session_state[state_key] = "Please enter a valid URL."
+
+
+# Fetch every link at once and keep one "# url" section per page that worked
+def _bulk_website_extraction(state_key, urls):
+    progress_text = st.empty()
+    with st.spinner(f"Extracting {len(urls)} links..."):
+        results = extract_urls(urls, progress_callback=progress_reporter(progress_text))
+    progress_text.empty()
+
+    for result in results:
+        if not result.ok:
+            st.warning(f"{result.url}: {result.error}")
+    main_text = join_results(results)
+    if main_text:
+        st.session_state[state_key] = main_text
+
+    with st.expander("Per-link timing"):
+        st.table([result.as_dict() for result in results])
+
+
+def _image_inputs(state_key):
+    image_files = st.file_uploader(
+        "Upload one or more image files",
+        type=["jpg", "jpeg", "png"],
+        accept_multiple_files=True,
+    )
+    if image_files and st.button("Extract Text from Images"):
+        images = [image_file.getvalue() for image_file in image_files]
+
+        def work(job):
+            def pieces():
+                for done, (index, text) in enumerate(iter_images(images), 1):
+                    job.report(done, len(images), index)
+                    yield text + "\n\n"
+
+            return job.collect(pieces())
+
+        key = make_key("images", content_hash("".join(map(content_hash, images))))
+        start_job(state_key, key, work, "images")
+
+
+def _pdf_inputs(state_key):
+    pdf_file = st.file_uploader("Upload a PDF file", type="pdf")
+    if not pdf_file:
+        return
+
+    all_pages = st.checkbox("OCR all pages")
+
+    if not all_pages:
+        start_page = st.number_input("Starting Page Number", min_value=1, step=1)
+        end_page = st.number_input("Ending Page Number", min_value=1, step=1)
+
+        if st.button("Extract Text from PDF"):
+            if start_page and end_page:
+                if start_page > end_page:
+                    start_page, end_page = end_page, start_page
+                _run_pdf_extraction(state_key, pdf_file, start_page, end_page)
+            else:
+                st.error("Please enter valid page numbers.")
+    else:
+        if st.button("Extract Text from PDF"):
+            _run_pdf_extraction(state_key, pdf_file, 1, float("inf"))
+
+
+def _run_pdf_extraction(state_key, pdf_file, start_page, end_page):
+    pdf_bytes = pdf_file.getvalue()
+
+    def work(job):
+        return job.collect(
+            iter_pdf(pdf_bytes, start_page, end_page, progress_callback=job.report)
+        )
+
+    key = make_key("pdf", content_hash(pdf_bytes), start=start_page, end=end_page)
+    start_job(state_key, key, work, "pdf")
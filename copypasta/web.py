@@ -0,0 +1,63 @@
+import itertools
+
+from . import config
+from .errors import ExtractionError
+from .fetch import fetch
+from .html_extract import extract_html_text, stream_html_text
+from .ocr import extract_text_from_image
+from .pdf import extract_text_from_pdf_parallel
+
+
+# Function to extract main body text from a URL
+def extract_text_from_url(url, progress_callback=None):
+    with fetch(url) as result:
+        return extract_text_from_response(result, progress_callback)
+
+
+# Function to extract text from a downloaded page, picking the extractor by
+# its Content-Type
+def extract_text_from_response(result, progress_callback=None):
+    mime_type = result.mime_type
+
+    if mime_type == "application/pdf":
+        # If the URL points to a PDF, save it to disk and extract from the
+        # file, so a big PDF is never held in memory whole
+        return extract_text_from_pdf_parallel(
+            result.save(".pdf"), 1, float("inf"), progress_callback=progress_callback
+        )
+    elif mime_type in ["image/png", "image/jpeg", "image/jpg"]:
+        # Read image data into bytes
+        return extract_text_from_image(result.read())
+    else:
+        return _html_text(result)
+
+
+# Function to extract text from an HTML page. Pages up to
+# config.HTML_STREAM_BYTES are read whole and given to the main-content
+# extractor; once a page has turned out bigger (by its Content-Length, or by
+# counting the decoded bytes when it is chunked or compressed) the rest is
+# parsed as it downloads, up to the character budget.
+def _html_text(result):
+    chunks = result.iter_chunks()
+    limit = config.HTML_STREAM_BYTES
+    if limit and (result.content_length or 0) > limit:
+        return _streamed_text(result, chunks)
+
+    head = []
+    size = 0
+    for chunk in chunks:
+        head.append(chunk)
+        size += len(chunk)
+        if limit and size > limit:
+            return _streamed_text(result, itertools.chain(head, chunks))
+    return extract_html_text(b"".join(head), result.url)
+
+
+# Function to parse a big page as it downloads. The body is gone once it has
+# been parsed, so there is nothing to fall back to: a page that gives no text
+# is an error rather than a silent empty result.
+def _streamed_text(result, chunks):
+    text = stream_html_text(chunks, result.charset)
+    if not text:
+        raise ExtractionError(f"No text found on {result.url}")
+    return text
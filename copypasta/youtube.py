@@ -0,0 +1,251 @@
+import json
+import re
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, parse_qs  # Add for improved YouTube parsing
+
+from . import config
+from .cache import get_cache, make_key
+from .errors import ExtractionError
+
+CHANNEL_PATTERN = re.compile(
+    r"(?:https?:\/\/)?(?:www\.|m\.)?youtube\.com\/(@[\w.-]+|channel\/[\w-]+|c\/[\w.-]+|user\/[\w.-]+)"
+)
+VIDEO_ID_IN_PAGE = re.compile(r'"videoId":"([a-zA-Z0-9_-]{11})"')
+
+
+# Function to extract YouTube video ID from URL (Improved)
+def extract_video_id(url):
+    # Define regex patterns for different YouTube URL formats. Playlist links
+    # carry a list ID, not a video ID; extract_playlist_id handles those.
+    patterns = [
+        r"(?:https?:\/\/)?(?:www\.)?youtube\.com\/(?:watch\?v=|embed\/|v\/|.+\?v=)([a-zA-Z0-9_-]{11})",
+        r"(?:https?:\/\/)?(?:www\.)?youtu\.be\/([a-zA-Z0-9_-]{11})",
+        r"(?:https?:\/\/)?(?:www\.)?youtube\.com\/shorts\/([a-zA-Z0-9_-]{11})",
+    ]
+
+    for pattern in patterns:
+        match = re.search(pattern, url)
+        if match:
+            return match.group(1)
+
+    # Fallback to parsing query parameters if regex fails
+    query = urlparse(url).query
+    params = parse_qs(query)
+    if "v" in params:
+        return params["v"][0]
+
+    return None
+
+
+# Function to extract the list ID from a youtube.com/playlist?list=... link
+def extract_playlist_id(url):
+    parsed = urlparse(url)
+    if "youtube.com" in parsed.netloc and parsed.path.rstrip("/") == "/playlist":
+        return parse_qs(parsed.query).get("list", [None])[0]
+    return None
+
+
+# Function to extract the channel path (@handle, channel/ID, c/name or
+# user/name) from a channel link
+def extract_channel_path(url):
+    match = CHANNEL_PATTERN.search(url)
+    return match.group(1) if match else None
+
+
+# Function to tell whether a link points at many videos rather than one
+def is_video_collection(url):
+    return bool(extract_playlist_id(url) or extract_channel_path(url))
+
+
+def _download_page(url):
+    from .fetch import fetch
+
+    with fetch(url) as result:
+        return result.read().decode(result.charset or "utf-8", errors="replace")
+
+
+# Function to list the video IDs of a playlist or channel, in page order and
+# without duplicates, up to config.YOUTUBE_MAX_VIDEOS. The IDs are read from
+# the public page, so no API key is needed; download_page(url) -> HTML can be
+# swapped for a recorded page.
+def resolve_video_ids(url, download_page=None, max_videos=None):
+    download_page = download_page or _download_page
+    max_videos = max_videos or config.YOUTUBE_MAX_VIDEOS
+    playlist_id = extract_playlist_id(url)
+    if playlist_id:
+        page_url = f"https://www.youtube.com/playlist?list={playlist_id}"
+    elif extract_channel_path(url):
+        page_url = f"https://www.youtube.com/{extract_channel_path(url)}/videos"
+    else:
+        video_id = extract_video_id(url)
+        return [video_id] if video_id else []
+
+    video_ids = []
+    for video_id in VIDEO_ID_IN_PAGE.findall(download_page(page_url)):
+        if video_id not in video_ids:
+            video_ids.append(video_id)
+            if len(video_ids) >= max_videos:
+                break
+    if not video_ids:
+        raise ExtractionError(f"No videos found at {url}")
+    return video_ids
+
+
+# A transcript with its timing kept as parallel arrays: texts[i] is said from
+# starts[i] for durations[i] seconds. Arrays of doubles take 8 bytes a value
+# instead of a dict per segment.
+class Transcript:
+    def __init__(self, video_id, language, texts, starts, durations):
+        self.video_id = video_id
+        self.language = language
+        self.texts = list(texts)
+        self.starts = array("d", starts)
+        self.durations = array("d", durations)
+
+    @classmethod
+    def from_segments(cls, video_id, language, segments):
+        return cls(
+            video_id,
+            language,
+            [segment["text"] for segment in segments],
+            [segment["start"] for segment in segments],
+            [segment.get("duration", 0.0) for segment in segments],
+        )
+
+    def text(self):
+        return " ".join(self.texts)
+
+    # Function to return the text said between start and end seconds
+    def slice(self, start, end):
+        return " ".join(
+            text
+            for text, segment_start in zip(self.texts, self.starts)
+            if start <= segment_start < end
+        )
+
+    # Function to return the transcript as "[mm:ss]" sections of seconds each
+    def time_sliced(self, seconds):
+        sections = {}
+        for text, start in zip(self.texts, self.starts):
+            sections.setdefault(int(start // seconds), []).append(text)
+        return "\n\n".join(
+            f"[{_timestamp(index * seconds)}] " + " ".join(texts)
+            for index, texts in sorted(sections.items())
+        )
+
+    def to_json(self):
+        return json.dumps(
+            [
+                self.video_id,
+                self.language,
+                self.texts,
+                list(self.starts),
+                list(self.durations),
+            ]
+        )
+
+    @classmethod
+    def from_json(cls, value):
+        return cls(*json.loads(value))
+
+
+def _timestamp(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes:02d}:{seconds:02d}"
+
+
+# Function to get (language_code, raw segments) from youtube_transcript_api,
+# whichever version is installed: the class methods of 0.x or the instance
+# API of 1.x. The language is the one YouTube returned, which may be a later
+# choice in languages than the first. Stand-ins with only get_transcript
+# (such as the benchmark's recording) don't say, so the first is assumed.
+def _api_segments(api, video_id, languages):
+    if hasattr(api, "list_transcripts"):
+        transcript = api.list_transcripts(video_id).find_transcript(languages)
+        return transcript.language_code, transcript.fetch()
+    if hasattr(api, "get_transcript"):
+        return languages[0], api.get_transcript(video_id, languages=languages)
+    fetched = api().fetch(video_id, languages=languages)
+    return fetched.language_code, fetched.to_raw_data()
+
+
+# Function to fetch the transcript of one video in the first available of
+# languages, from the persistent cache when it has been fetched before. api
+# stands in for youtube_transcript_api.YouTubeTranscriptApi (e.g. a recorded
+# fixture).
+def fetch_transcript(video_id, languages=None, api=None):
+    languages = list(languages or config.YOUTUBE_LANGUAGES)
+    cache = get_cache()
+    key = make_key("youtube_transcript", video_id, languages=languages)
+    value = cache.get(key)
+    if value is not None:
+        return Transcript.from_json(value)
+
+    if api is None:
+        from youtube_transcript_api import YouTubeTranscriptApi as api
+    try:
+        language, segments = _api_segments(api, video_id, languages)
+    except Exception as e:
+        raise ExtractionError(f"Error extracting YouTube transcript: {e}") from e
+    transcript = Transcript.from_segments(video_id, language, segments)
+    cache.set(key, transcript.to_json())
+    return transcript
+
+
+# Function to fetch many transcripts, at most concurrency at a time. Returns
+# (video_id, transcript, error) per video in input order; a video without a
+# transcript gets its error instead of stopping the rest.
+def fetch_transcripts(
+    video_ids, languages=None, concurrency=None, api=None, progress_callback=None
+):
+    concurrency = concurrency or config.YOUTUBE_CONCURRENCY
+
+    def fetch_one(video_id):
+        try:
+            return video_id, fetch_transcript(video_id, languages, api), None
+        except ExtractionError as e:
+            return video_id, None, str(e)
+
+    results = []
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for index, result in enumerate(executor.map(fetch_one, video_ids)):
+            results.append(result)
+            if progress_callback:
+                progress_callback(index + 1, len(video_ids), index)
+    return results
+
+
+# Function to format a transcript as text, in "[mm:ss]" sections when
+# config.YOUTUBE_SLICE_SECONDS is set
+def transcript_text(transcript):
+    if config.YOUTUBE_SLICE_SECONDS:
+        return transcript.time_sliced(config.YOUTUBE_SLICE_SECONDS)
+    return transcript.text()
+
+
+# Function to extract transcript from a YouTube video. Transcripts are kept in
+# the persistent cache, so repeat requests skip the round trip.
+def extract_youtube_transcript(video_id):
+    return transcript_text(fetch_transcript(video_id))
+
+
+# Function to extract the transcripts of every video in a playlist or channel
+# as one "# Video <id>" section each. Videos without a transcript are skipped;
+# if none has one, the first error is raised.
+def extract_youtube_collection(
+    url, progress_callback=None, api=None, download_page=None
+):
+    video_ids = resolve_video_ids(url, download_page)
+    results = fetch_transcripts(video_ids, api=api, progress_callback=progress_callback)
+    sections = [
+        f"# Video {video_id}\n{transcript_text(transcript)}"
+        for video_id, transcript, error in results
+        if transcript is not None
+    ]
+    if not sections:
+        raise ExtractionError(results[0][2])
+    return "\n\n".join(sections)